@@ -1,9 +1,11 @@
 """
 SonIA Core — Configuration
 All settings loaded from environment variables for easy migration to AWS.
+Values are read and cast once into a frozen Settings instance (`settings`).
 """
 
 import os
+from dataclasses import dataclass
 from datetime import timezone, timedelta
 
 # ============================================================================
@@ -11,68 +13,105 @@ from datetime import timezone, timedelta
 # ============================================================================
 COT = timezone(timedelta(hours=-5))  # Colombia Time
 
-# ============================================================================
-# DATABASE — PostgreSQL (Railway)
-# ============================================================================
-DATABASE_URL = os.getenv("DATABASE_URL", "")
-# Railway provides DATABASE_URL. For local dev, set manually.
 
-# ============================================================================
-# AWS — DynamoDB (READ ONLY)
-# ============================================================================
-AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
-AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
-AWS_REGION = os.getenv("AWS_REGION", "us-east-1")
-DYNAMO_TABLE_RESERVES = os.getenv("DYNAMO_TABLE_RESERVES", "reserves")
+@dataclass(frozen=True, slots=True)
+class Settings:
+    # ========================================================================
+    # DATABASE — PostgreSQL (Railway)
+    # ========================================================================
+    DATABASE_URL: str  # Railway provides DATABASE_URL. For local dev, set manually.
 
-# ============================================================================
-# FedEx API
-# ============================================================================
-FEDEX_API_KEY = os.getenv("FEDEX_API_KEY", "")
-FEDEX_SECRET_KEY = os.getenv("FEDEX_SECRET_KEY", "")
-FEDEX_ACCOUNT = os.getenv("FEDEX_ACCOUNT", "")
-FEDEX_BASE_URL = os.getenv("FEDEX_BASE_URL", "https://apis.fedex.com")
+    # ========================================================================
+    # AWS — DynamoDB (READ ONLY)
+    # ========================================================================
+    AWS_ACCESS_KEY_ID: str
+    AWS_SECRET_ACCESS_KEY: str
+    AWS_REGION: str
+    DYNAMO_TABLE_RESERVES: str
 
-# ============================================================================
-# Odoo
-# ============================================================================
-ODOO_URL = os.getenv("ODOO_URL", "")
-ODOO_DB = os.getenv("ODOO_DB", "")
-ODOO_USERNAME = os.getenv("ODOO_USERNAME", "")
-ODOO_PASSWORD = os.getenv("ODOO_PASSWORD", "")
+    # ========================================================================
+    # FedEx API
+    # ========================================================================
+    FEDEX_API_KEY: str
+    FEDEX_SECRET_KEY: str
+    FEDEX_ACCOUNT: str
+    FEDEX_BASE_URL: str
 
-# ============================================================================
-# SonIA Agent (WhatsApp sender)
-# ============================================================================
-SONIA_AGENT_URL = os.getenv("SONIA_AGENT_URL", "")  # e.g., https://sonia-agent-production.up.railway.app
-SONIA_AGENT_API_KEY = os.getenv("SONIA_AGENT_API_KEY", "")
+    # ========================================================================
+    # Odoo
+    # ========================================================================
+    ODOO_URL: str
+    ODOO_DB: str
+    ODOO_USERNAME: str
+    ODOO_PASSWORD: str
 
-# ============================================================================
-# Admin notification
-# ============================================================================
-ADMIN_WHATSAPP = os.getenv("ADMIN_WHATSAPP", "")  # Danny's WhatsApp number
+    # ========================================================================
+    # SonIA Agent (WhatsApp sender)
+    # ========================================================================
+    SONIA_AGENT_URL: str  # e.g., https://sonia-agent-production.up.railway.app
+    SONIA_AGENT_API_KEY: str
 
-# ============================================================================
-# Anomaly Detection Thresholds (configurable)
-# ============================================================================
-THRESHOLD_TRANSIT_DAYS = int(os.getenv("THRESHOLD_TRANSIT_DAYS", "7"))
-THRESHOLD_CUSTOMS_DAYS = int(os.getenv("THRESHOLD_CUSTOMS_DAYS", "5"))
-THRESHOLD_DELIVERY_ATTEMPT_DAYS = int(os.getenv("THRESHOLD_DELIVERY_ATTEMPT_DAYS", "2"))
-THRESHOLD_LABEL_NO_MOVEMENT_DAYS = int(os.getenv("THRESHOLD_LABEL_NO_MOVEMENT_DAYS", "5"))
+    # ========================================================================
+    # Admin notification
+    # ========================================================================
+    ADMIN_WHATSAPP: str  # Danny's WhatsApp number
 
-# ============================================================================
-# Cron Schedule
-# ============================================================================
-CRON_HOUR = int(os.getenv("CRON_HOUR", "4"))  # 4 AM COT
-CRON_MINUTE = int(os.getenv("CRON_MINUTE", "0"))
+    # ========================================================================
+    # Anomaly Detection Thresholds (configurable)
+    # ========================================================================
+    THRESHOLD_TRANSIT_DAYS: int
+    THRESHOLD_CUSTOMS_DAYS: int
+    THRESHOLD_DELIVERY_ATTEMPT_DAYS: int
+    THRESHOLD_LABEL_NO_MOVEMENT_DAYS: int
 
-# ============================================================================
-# FedEx API Batch Settings
-# ============================================================================
-FEDEX_BATCH_SIZE = int(os.getenv("FEDEX_BATCH_SIZE", "30"))  # Max 30 per FedEx recommendation
-FEDEX_BATCH_DELAY = float(os.getenv("FEDEX_BATCH_DELAY", "0.5"))  # Seconds between batches
+    # ========================================================================
+    # Cron Schedule
+    # ========================================================================
+    CRON_HOUR: int  # 4 AM COT
+    CRON_MINUTE: int
+    TENANT_CONCURRENCY: int  # Tenants processed in parallel
 
-# ============================================================================
-# Server
-# ============================================================================
-PORT = int(os.getenv("PORT", "8080"))
+    # ========================================================================
+    # FedEx API Batch Settings
+    # ========================================================================
+    FEDEX_BATCH_SIZE: int  # Max 30 per FedEx recommendation
+    FEDEX_CONCURRENCY: int  # Concurrent batch requests in flight
+
+    # ========================================================================
+    # Server
+    # ========================================================================
+    PORT: int
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        return cls(
+            DATABASE_URL=os.getenv("DATABASE_URL", ""),
+            AWS_ACCESS_KEY_ID=os.getenv("AWS_ACCESS_KEY_ID", ""),
+            AWS_SECRET_ACCESS_KEY=os.getenv("AWS_SECRET_ACCESS_KEY", ""),
+            AWS_REGION=os.getenv("AWS_REGION", "us-east-1"),
+            DYNAMO_TABLE_RESERVES=os.getenv("DYNAMO_TABLE_RESERVES", "reserves"),
+            FEDEX_API_KEY=os.getenv("FEDEX_API_KEY", ""),
+            FEDEX_SECRET_KEY=os.getenv("FEDEX_SECRET_KEY", ""),
+            FEDEX_ACCOUNT=os.getenv("FEDEX_ACCOUNT", ""),
+            FEDEX_BASE_URL=os.getenv("FEDEX_BASE_URL", "https://apis.fedex.com"),
+            ODOO_URL=os.getenv("ODOO_URL", ""),
+            ODOO_DB=os.getenv("ODOO_DB", ""),
+            ODOO_USERNAME=os.getenv("ODOO_USERNAME", ""),
+            ODOO_PASSWORD=os.getenv("ODOO_PASSWORD", ""),
+            SONIA_AGENT_URL=os.getenv("SONIA_AGENT_URL", ""),
+            SONIA_AGENT_API_KEY=os.getenv("SONIA_AGENT_API_KEY", ""),
+            ADMIN_WHATSAPP=os.getenv("ADMIN_WHATSAPP", ""),
+            THRESHOLD_TRANSIT_DAYS=int(os.getenv("THRESHOLD_TRANSIT_DAYS", "7")),
+            THRESHOLD_CUSTOMS_DAYS=int(os.getenv("THRESHOLD_CUSTOMS_DAYS", "5")),
+            THRESHOLD_DELIVERY_ATTEMPT_DAYS=int(os.getenv("THRESHOLD_DELIVERY_ATTEMPT_DAYS", "2")),
+            THRESHOLD_LABEL_NO_MOVEMENT_DAYS=int(os.getenv("THRESHOLD_LABEL_NO_MOVEMENT_DAYS", "5")),
+            CRON_HOUR=int(os.getenv("CRON_HOUR", "4")),
+            CRON_MINUTE=int(os.getenv("CRON_MINUTE", "0")),
+            TENANT_CONCURRENCY=int(os.getenv("TENANT_CONCURRENCY", "4")),
+            FEDEX_BATCH_SIZE=int(os.getenv("FEDEX_BATCH_SIZE", "30")),
+            FEDEX_CONCURRENCY=int(os.getenv("FEDEX_CONCURRENCY", "8")),
+            PORT=int(os.getenv("PORT", "8080")),
+        )
+
+
+settings = Settings.from_env()
@@ -14,17 +14,25 @@ Runs daily at 4:00 AM COT (UTC-5):
 Error handling: ALL errors are notified to admin via WhatsApp
 """
 import os
+import asyncio
+import base64
+import hashlib
 import logging
+import time
 import traceback
-import psycopg2
 from datetime import datetime, timezone, timedelta
+from concurrent.futures import ThreadPoolExecutor
 from contextlib import asynccontextmanager
-from typing import Dict, List, Any, Optional
-from collections import defaultdict
+from dataclasses import asdict, dataclass, fields
+from collections import deque
+from collections.abc import Mapping
+from functools import lru_cache, partial
+from typing import Dict, Iterable, List, Any, Optional
 
+import orjson
 from fastapi import FastAPI, HTTPException
-from apscheduler.schedulers.asyncio import AsyncIOScheduler
-from apscheduler.triggers.cron import CronTrigger
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from psycopg2.extras import execute_values
 
 from modules.dynamo_reader import DynamoReader
 from modules.fedex_tracker import FedExTracker
@@ -46,35 +54,105 @@ COT = timezone(timedelta(hours=-5))
 # DATABASE MIGRATION
 # ============================================================================
 
+_MIGRATION_LOCK_NAME = "sonia_migrations"
+# 001 predates schema_migrations and uses plain CREATE TYPE/TABLE, so on a
+# database already holding its schema it can only fail. When every table it
+# creates is present, it is recorded as applied instead of re-run
+_BASELINE_MIGRATION = "001_initial_schema.sql"
+_BASELINE_TABLES = ("clients", "client_contacts", "shipments", "claims",
+                    "daily_run_logs", "tenant_mapping")
+
+def _read_migrations(migrations_dir: str) -> List[tuple]:
+    """Load every .sql file up front as (fname, sql, checksum), ordered by name."""
+    migrations = []
+    for fname in sorted(os.listdir(migrations_dir)):
+        if fname.endswith(".sql"):
+            with open(os.path.join(migrations_dir, fname), "r") as f:
+                sql = f.read()
+            migrations.append((fname, sql, hashlib.blake2b(sql.encode("utf-8")).hexdigest()))
+    return migrations
+
+
 def run_migration():
-    """Auto-run SQL migrations on startup. Runs each file independently."""
-    db_url = os.getenv("DATABASE_URL", "")
-    if not db_url:
+    """
+    Auto-run SQL migrations on startup.
+    Borrows a connection from the shared DBManager pool instead of opening
+    a one-shot connection of its own.
+
+    All files are read before touching the database, then pending ones are
+    applied inside a single transaction that commits once at the end. Each
+    file runs under its own SAVEPOINT, so a failing file is rolled back on
+    its own without discarding the others.
+
+    Applied files are recorded in schema_migrations with a BLAKE2 checksum
+    and skipped while unchanged. A Postgres advisory lock makes sure only
+    one worker migrates when several boot at once; the others wait for it
+    and then find every file already applied, so no worker proceeds against
+    a half-migrated schema.
+    """
+    if not config.DATABASE_URL:
         logger.warning("No DATABASE_URL - skipping migration")
         return
 
     try:
-        conn = psycopg2.connect(db_url)
-        conn.autocommit = True
-        cur = conn.cursor()
-
         migrations_dir = os.path.join(os.path.dirname(__file__), "migrations")
-        if os.path.isdir(migrations_dir):
-            for fname in sorted(os.listdir(migrations_dir)):
-                if fname.endswith(".sql"):
-                    fpath = os.path.join(migrations_dir, fname)
+        if not os.path.isdir(migrations_dir):
+            logger.warning(f"Migrations dir not found: {migrations_dir}")
+            return
+        migrations = _read_migrations(migrations_dir)
+
+        db = DBManager(config.DATABASE_URL, max_connections=config.DB_POOL_MAX)
+        with db.connection() as conn, conn.cursor() as cur:
+            # Blocks until a concurrently booting worker has finished migrating
+            cur.execute("SELECT pg_advisory_lock(hashtext(%s))", (_MIGRATION_LOCK_NAME,))
+
+            try:
+                cur.execute(
+                    "CREATE TABLE IF NOT EXISTS schema_migrations ("
+                    " version TEXT PRIMARY KEY,"
+                    " checksum TEXT NOT NULL,"
+                    " applied_at TIMESTAMPTZ NOT NULL DEFAULT NOW())"
+                )
+                cur.execute("SELECT version, checksum FROM schema_migrations")
+                applied = dict(cur.fetchall())
+
+                baseline = next((m for m in migrations if m[0] == _BASELINE_MIGRATION), None)
+                if baseline and _BASELINE_MIGRATION not in applied:
+                    cur.execute(
+                        "SELECT bool_and(to_regclass(t) IS NOT NULL) FROM unnest(%s::text[]) AS t",
+                        (list(_BASELINE_TABLES),)
+                    )
+                    if cur.fetchone()[0]:
+                        cur.execute(
+                            "INSERT INTO schema_migrations (version, checksum) VALUES (%s, %s)",
+                            (_BASELINE_MIGRATION, baseline[2])
+                        )
+                        applied[_BASELINE_MIGRATION] = baseline[2]
+                        logger.info(f"Existing schema found - recorded {_BASELINE_MIGRATION} as applied")
+
+                for fname, sql, checksum in migrations:
+                    if applied.get(fname) == checksum:
+                        logger.info(f"Migration {fname} already applied - skipping")
+                        continue
+                    cur.execute("SAVEPOINT sonia_migration")
                     try:
-                        with open(fpath, "r") as f:
-                            sql = f.read()
                         cur.execute(sql)
+                        cur.execute(
+                            "INSERT INTO schema_migrations (version, checksum) VALUES (%s, %s)"
+                            " ON CONFLICT (version) DO UPDATE SET"
+                            " checksum = EXCLUDED.checksum, applied_at = NOW()",
+                            (fname, checksum)
+                        )
+                        cur.execute("RELEASE SAVEPOINT sonia_migration")
                         logger.info(f"Migration {fname} applied successfully")
                     except Exception as me:
+                        cur.execute("ROLLBACK TO SAVEPOINT sonia_migration")
                         logger.warning(f"Migration {fname} note: {me}")
-        else:
-            logger.warning(f"Migrations dir not found: {migrations_dir}")
-
-        cur.close()
-        conn.close()
+                conn.commit()
+            finally:
+                conn.rollback()
+                cur.execute("SELECT pg_advisory_unlock(hashtext(%s))", (_MIGRATION_LOCK_NAME,))
+                conn.commit()
     except Exception as e:
         logger.error(f"Migration error: {e}")
 
@@ -83,96 +161,270 @@ def run_migration():
 # CONFIGURATION
 # ============================================================================
 
+@dataclass(frozen=True, slots=True)
 class Config:
-    DATABASE_URL = os.getenv("DATABASE_URL", "")
-    AWS_ACCESS_KEY_ID = os.getenv("AWS_ACCESS_KEY_ID", "")
-    AWS_SECRET_ACCESS_KEY = os.getenv("AWS_SECRET_ACCESS_KEY", "")
-    AWS_REGION = os.getenv("AWS_REGION", "us-east-2")
-    DYNAMO_TABLE = os.getenv("DYNAMO_TABLE_RESERVES", "reserves")
-    FEDEX_API_KEY = os.getenv("FEDEX_API_KEY", "")
-    FEDEX_SECRET_KEY = os.getenv("FEDEX_SECRET_KEY", "")
-    FEDEX_ACCOUNT = os.getenv("FEDEX_ACCOUNT", "")
-    ODOO_URL = os.getenv("ODOO_URL", "")
-    ODOO_DB = os.getenv("ODOO_DB", "")
-    ODOO_USER = os.getenv("ODOO_USER", "")
-    ODOO_PASSWORD = os.getenv("ODOO_PASSWORD", "")
-    ODOO_TENANT_FIELD = os.getenv("ODOO_TENANT_FIELD", "x_studio_tenant")
-    ODOO_SPREADSHEET_ID = int(os.getenv("ODOO_SPREADSHEET_ID", "114"))
-    SONIA_AGENT_URL = os.getenv("SONIA_AGENT_URL", "")
-    SONIA_AGENT_API_KEY = os.getenv("SONIA_AGENT_API_KEY", "")
-    ADMIN_WHATSAPP = os.getenv("ADMIN_WHATSAPP", "")
-    RUN_HOUR_COT = int(os.getenv("RUN_HOUR_COT", "4"))
-    ENVIRONMENT = os.getenv("ENVIRONMENT", "development")
-
-
-config = Config()
+    """
+    Environment settings, parsed and cast once at import (`config`).
+    Frozen and slotted: attribute reads skip the instance dict, and the
+    instance is hashable, so it can key memoized builders.
+    """
+    DATABASE_URL: str
+    DB_POOL_MAX: int
+    AWS_ACCESS_KEY_ID: str
+    AWS_SECRET_ACCESS_KEY: str
+    AWS_REGION: str
+    DYNAMO_TABLE: str
+    DYNAMO_SCAN_SEGMENTS: int
+    FEDEX_API_KEY: str
+    FEDEX_SECRET_KEY: str
+    FEDEX_ACCOUNT: str
+    FEDEX_CONCURRENCY: int
+    FEDEX_BATCH_SIZE: int
+    TENANT_CONCURRENCY: int
+    WHATSAPP_CONCURRENCY: int
+    IO_POOL_WORKERS: int
+    ALWAYS_REPORT: bool
+    ODOO_URL: str
+    ODOO_DB: str
+    ODOO_USER: str
+    ODOO_PASSWORD: str
+    ODOO_TENANT_FIELD: str
+    ODOO_SPREADSHEET_ID: int
+    SONIA_AGENT_URL: str
+    SONIA_AGENT_API_KEY: str
+    ADMIN_WHATSAPP: str
+    SEND_CONSOLIDATED_REPORT: bool
+    RUN_HOUR_COT: int
+    HEALTH_CACHE_SECONDS: float
+    ENVIRONMENT: str
+
+    @classmethod
+    def from_env(cls) -> "Config":
+        """Read and cast every setting once, at import time."""
+        return cls(
+            DATABASE_URL=os.getenv("DATABASE_URL", ""),
+            DB_POOL_MAX=int(os.getenv("DB_POOL_MAX", "10")),
+            AWS_ACCESS_KEY_ID=os.getenv("AWS_ACCESS_KEY_ID", ""),
+            AWS_SECRET_ACCESS_KEY=os.getenv("AWS_SECRET_ACCESS_KEY", ""),
+            AWS_REGION=os.getenv("AWS_REGION", "us-east-2"),
+            DYNAMO_TABLE=os.getenv("DYNAMO_TABLE_RESERVES", "reserves"),
+            DYNAMO_SCAN_SEGMENTS=int(os.getenv("DYNAMO_SCAN_SEGMENTS", "8")),
+            FEDEX_API_KEY=os.getenv("FEDEX_API_KEY", ""),
+            FEDEX_SECRET_KEY=os.getenv("FEDEX_SECRET_KEY", ""),
+            FEDEX_ACCOUNT=os.getenv("FEDEX_ACCOUNT", ""),
+            FEDEX_CONCURRENCY=int(os.getenv("FEDEX_CONCURRENCY", "8")),
+            # FedEx accepts at most 30 tracking numbers per request
+            FEDEX_BATCH_SIZE=max(1, min(30, int(os.getenv("FEDEX_BATCH_SIZE", "30")))),
+            TENANT_CONCURRENCY=int(os.getenv("TENANT_CONCURRENCY", "4")),
+            WHATSAPP_CONCURRENCY=int(os.getenv("WHATSAPP_CONCURRENCY", "4")),
+            IO_POOL_WORKERS=int(os.getenv("IO_POOL_WORKERS", "32")),
+            ALWAYS_REPORT=os.getenv("ALWAYS_REPORT", "false").lower() in ("1", "true", "yes"),
+            ODOO_URL=os.getenv("ODOO_URL", ""),
+            ODOO_DB=os.getenv("ODOO_DB", ""),
+            ODOO_USER=os.getenv("ODOO_USER", ""),
+            ODOO_PASSWORD=os.getenv("ODOO_PASSWORD", ""),
+            ODOO_TENANT_FIELD=os.getenv("ODOO_TENANT_FIELD", "x_studio_tenant"),
+            ODOO_SPREADSHEET_ID=int(os.getenv("ODOO_SPREADSHEET_ID", "114")),
+            SONIA_AGENT_URL=os.getenv("SONIA_AGENT_URL", ""),
+            SONIA_AGENT_API_KEY=os.getenv("SONIA_AGENT_API_KEY", ""),
+            ADMIN_WHATSAPP=os.getenv("ADMIN_WHATSAPP", ""),
+            SEND_CONSOLIDATED_REPORT=os.getenv("SEND_CONSOLIDATED_REPORT", "false").lower() in ("1", "true", "yes"),
+            RUN_HOUR_COT=int(os.getenv("RUN_HOUR_COT", "4")),
+            HEALTH_CACHE_SECONDS=max(0.0, float(os.getenv("HEALTH_CACHE_SECONDS", "5"))),
+            ENVIRONMENT=os.getenv("ENVIRONMENT", "development"),
+        )
+
+
+config = Config.from_env()
+
+
+# ============================================================================
+# RUN STATS
+# ============================================================================
+
+@dataclass(slots=True)
+class RunStats:
+    """Counters for one daily run. Each tenant fills its own and merges it in."""
+    total_shipments_read: int = 0
+    tenants_found: int = 0
+    tenants_in_mapping: int = 0
+    tenants_missing_mapping: int = 0
+    tenants_no_whatsapp: int = 0
+    tenants_skipped_quiet: int = 0
+    new_shipments: int = 0
+    shipments_checked: int = 0
+    shipments_updated: int = 0
+    shipments_delivered: int = 0
+    claims_created: int = 0
+    reports_generated: int = 0
+    reports_sent: int = 0
+    alerts_sent: int = 0
+    excel_reports_generated: int = 0
+    excel_reports_sent: int = 0
+    consolidated_excel: Optional[str] = None
+
+    def merge(self, other: "RunStats") -> None:
+        """Add another RunStats' counters into this one."""
+        for f in fields(self):
+            value = getattr(other, f.name)
+            if isinstance(value, int):
+                setattr(self, f.name, getattr(self, f.name) + value)
+
+    def as_dict(self) -> Dict[str, Any]:
+        return asdict(self)
+
+
+class RunErrors:
+    """
+    Bounded error log for one run: every error is counted, but only the last
+    `keep` are kept verbatim, so an error storm can't balloon memory or the
+    stored run log.
+    """
+    __slots__ = ("recent", "count")
+
+    def __init__(self, keep: int = 200):
+        self.recent = deque(maxlen=keep)
+        self.count = 0
+
+    def append(self, error: Dict[str, Any]) -> None:
+        self.count += 1
+        self.recent.append(error)
+
+    def __bool__(self) -> bool:
+        return self.count > 0
+
+    def __len__(self) -> int:
+        return self.count
+
+    def as_list(self) -> List[Dict[str, Any]]:
+        return list(self.recent)
 
 
 # ============================================================================
 # MODULE INITIALIZATION
 # ============================================================================
 
-def init_modules():
-    """Initialize all modules with config."""
-    mods = {}
+# Modules are built on first use (get_module) rather than at startup, so the
+# process holds no boto3 sessions or open sockets between daily runs.
 
-    # Database
-    if config.DATABASE_URL:
-        mods["db"] = DBManager(config.DATABASE_URL)
-        logger.info("DBManager initialized")
-    else:
+def _build_db():
+    if not config.DATABASE_URL:
         logger.warning("DATABASE_URL not set - DB features disabled")
+        return None
+    return DBManager(config.DATABASE_URL, max_connections=config.DB_POOL_MAX)
+
+
+def _build_dynamo():
+    if not config.AWS_ACCESS_KEY_ID:
+        return None
+    return DynamoReader(
+        aws_access_key=config.AWS_ACCESS_KEY_ID,
+        aws_secret_key=config.AWS_SECRET_ACCESS_KEY,
+        region=config.AWS_REGION,
+        table_name=config.DYNAMO_TABLE,
+        scan_segments=config.DYNAMO_SCAN_SEGMENTS,
+    )
 
-    # DynamoDB Reader
-    if config.AWS_ACCESS_KEY_ID:
-        mods["dynamo"] = DynamoReader(
-            aws_access_key=config.AWS_ACCESS_KEY_ID,
-            aws_secret_key=config.AWS_SECRET_ACCESS_KEY,
-            region=config.AWS_REGION,
-            table_name=config.DYNAMO_TABLE,
-        )
-        logger.info("DynamoReader initialized")
-
-    # FedEx Tracker
-    if config.FEDEX_API_KEY:
-        mods["fedex"] = FedExTracker(
-            client_id=config.FEDEX_API_KEY,
-            client_secret=config.FEDEX_SECRET_KEY,
-            account_number=config.FEDEX_ACCOUNT,
-        )
-        logger.info("FedExTracker initialized")
 
-    # Anomaly Detector
-    mods["anomaly"] = AnomalyDetector()
-    logger.info("AnomalyDetector initialized")
+def _build_fedex():
+    if not config.FEDEX_API_KEY:
+        return None
+    return FedExTracker(
+        client_id=config.FEDEX_API_KEY,
+        client_secret=config.FEDEX_SECRET_KEY,
+        account_number=config.FEDEX_ACCOUNT,
+        max_concurrency=config.FEDEX_CONCURRENCY,
+    )
 
-    # Report Generator
-    mods["reports"] = ReportGenerator()
-    logger.info("ReportGenerator initialized")
 
-    # WhatsApp Sender
-    if config.SONIA_AGENT_URL:
-        mods["whatsapp"] = WhatsAppSender(
-            agent_url=config.SONIA_AGENT_URL,
-            api_key=config.SONIA_AGENT_API_KEY,
-        )
-        logger.info("WhatsAppSender initialized")
-
-    # Odoo Client
-    if config.ODOO_URL and config.ODOO_USER:
-        mods["odoo"] = OdooClient(
-            url=config.ODOO_URL,
-            db=config.ODOO_DB,
-            username=config.ODOO_USER,
-            password=config.ODOO_PASSWORD,
-        )
-        logger.info("OdooClient initialized")
+def _build_whatsapp():
+    if not config.SONIA_AGENT_URL:
+        return None
+    return WhatsAppSender(
+        agent_url=config.SONIA_AGENT_URL,
+        api_key=config.SONIA_AGENT_API_KEY,
+        max_concurrency=config.WHATSAPP_CONCURRENCY,
+    )
+
+
+def _build_odoo():
+    if not (config.ODOO_URL and config.ODOO_USER):
+        return None
+    return OdooClient(
+        url=config.ODOO_URL,
+        db=config.ODOO_DB,
+        username=config.ODOO_USER,
+        password=config.ODOO_PASSWORD,
+    )
+
+
+def _build_io_pool():
+    # Dedicated pool for blocking DB/Odoo/WhatsApp calls made from async code,
+    # so they don't compete with the loop's default executor
+    return ThreadPoolExecutor(
+        max_workers=config.IO_POOL_WORKERS, thread_name_prefix="sonia-io"
+    )
+
+
+_MODULE_BUILDERS = {
+    "db": _build_db,
+    "dynamo": _build_dynamo,
+    "fedex": _build_fedex,
+    "anomaly": AnomalyDetector,
+    "reports": ReportGenerator,
+    "whatsapp": _build_whatsapp,
+    "odoo": _build_odoo,
+    "excel_gen": ExcelReportGenerator,
+    "io_pool": _build_io_pool,
+}
+
+_loaded_modules: Dict[str, Any] = {}
+
+
+@lru_cache(maxsize=None)
+def get_module(name: str):
+    """Build module `name` on first access and reuse it. None if not configured."""
+    builder = _MODULE_BUILDERS.get(name)
+    if builder is None:
+        return None
+    mod = builder()
+    if mod is not None:
+        _loaded_modules[name] = mod
+        logger.info(f"{type(mod).__name__} initialized")
+    return mod
 
-    # Excel Report Generator
-    mods["excel_gen"] = ExcelReportGenerator()
-    logger.info("ExcelReportGenerator initialized")
 
-    return mods
+class LazyModules(Mapping):
+    """
+    Dict-like view over get_module() so `modules.get("db")` keeps working.
+    Lookups build on demand; iteration and `in` only see modules already built.
+    """
+
+    def __getitem__(self, name: str):
+        mod = get_module(name)
+        if mod is None:
+            raise KeyError(name)
+        return mod
+
+    def get(self, name: str, default=None):
+        # Straight to the cached builder, skipping Mapping.get's try/KeyError
+        mod = get_module(name)
+        return default if mod is None else mod
+
+    def __contains__(self, name) -> bool:
+        return name in _loaded_modules
+
+    def __iter__(self):
+        return iter(list(_loaded_modules))
+
+    def __len__(self) -> int:
+        return len(_loaded_modules)
+
+
+async def _run_io(func, /, *args, **kwargs):
+    """Run a blocking call on the shared io_pool without stalling the event loop."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(get_module("io_pool"), partial(func, *args, **kwargs))
 
 
 # ============================================================================
@@ -182,9 +434,11 @@ def init_modules():
 flow_progress = {
     "running": False,
     "phase": "",
-    "tenant_current": "",
+    # tenant_id -> {"name", "phase"} for every tenant currently in flight.
+    # Each tenant coroutine owns its own entry, so updates need no lock
+    "tenant_current": {},
     "tenant_total": 0,
-    "tenant_index": 0,
+    "tenants_done": 0,
     "packages_total": 0,
     "packages_done": 0,
     "started_at": None,
@@ -196,6 +450,60 @@ flow_progress = {
 # ADMIN WHATSAPP ALERT HELPERS
 # ============================================================================
 
+# Templates are built once at import; helpers only fill them via format_map
+_ALERT_HEADER = "\u26a0\ufe0f *SonIA Tracker \u2014 Alerta*\n\n"
+_ERROR_HEADER = "\U0001f6a8 *SonIA Tracker \u2014 Error*\n\n"
+_ALERT_FOOTER = "\U0001f916 SonIA Tracker \u2014 {now}"
+
+_TENANT_NOT_FOUND_TEMPLATE = (
+    _ALERT_HEADER
+    + "Tenant #{tenant_number} existe en DynamoDB pero no se "
+    "encontro en tenant_mapping.\n\n"
+    "\U0001f4e6 Guias pendientes: {pending}\n"
+    "\U0001f4cb Tracking: {guides}\n\n"
+    "*Accion requerida:* Sincronizar este tenant usando "
+    "POST /admin/sync-tenants para agregarlo a la base de datos.\n\n"
+    + _ALERT_FOOTER
+)
+
+_NO_WHATSAPP_TEMPLATE = (
+    _ALERT_HEADER
+    + "El tenant {tenant_name} (#{tenant_number}) "
+    "no tiene contactos con WhatsApp asignados.\n\n"
+    "\U0001f4e6 Guias pendientes: {tracking_count}\n\n"
+    "*Accion requerida:* Agregar contactos a este tenant "
+    "usando POST /admin/sync-tenants.\n\n"
+    + _ALERT_FOOTER
+)
+
+_FLOW_ERROR_TEMPLATE = (
+    _ERROR_HEADER
+    + "Se produjo un error durante el ciclo diario:\n\n"
+    "\U0001f464 Cliente/Tenant: {client_label}\n"
+    "\u274c Tipo de error: {error_type}\n"
+    "\U0001f4e6 Guias afectadas: {affected_count}\n"
+    "\U0001f4ca Total guias en ciclo: {total_count} (excluyendo entregadas)\n"
+    "\U0001f504 Alcance: {scope}\n\n"
+    "Detalle: {error_msg}\n\n"
+    + _ALERT_FOOTER
+)
+
+_DAILY_SUMMARY_TEMPLATE = (
+    "\U0001f4ca *SonIA Tracker \u2014 Resumen Diario*\n\n"
+    "Estado: {status_label}\n"
+    "Errores: {error_count}{errors_kept}\n"
+    "Tenants procesados: {tenants_in_mapping}/{tenants_found}\n"
+    "Reportes enviados: {reports_sent}\n"
+    "Alertas enviadas: {alerts_sent}\n\n"
+    + _ALERT_FOOTER
+)
+
+
+def _now_str() -> str:
+    """Timestamp used in admin messages, e.g. 14/10/2026 04:00 AM."""
+    return f"{datetime.now(COT):%d/%m/%Y %I:%M %p}"
+
+
 def _send_admin_alert(whatsapp: WhatsAppSender, message: str):
     """Send a WhatsApp alert to the admin. Never fails silently."""
     if not whatsapp or not config.ADMIN_WHATSAPP:
@@ -209,60 +517,50 @@ def _send_admin_alert(whatsapp: WhatsAppSender, message: str):
 
 
 def _alert_tenant_not_found(whatsapp: WhatsAppSender, tenant_number: int,
-                             tracking_numbers: List[str]):
+                             tracking_numbers: List[str], now_str: Optional[str] = None):
     """Alert admin: tenant exists in DynamoDB but not in tenant_mapping."""
-    now = datetime.now(COT).strftime("%d/%m/%Y %I:%M %p")
     guides = ", ".join(tracking_numbers[:5])
     if len(tracking_numbers) > 5:
         guides += f" ... (+{len(tracking_numbers) - 5} mas)"
 
-    msg = (
-        f"\u26a0\ufe0f *SonIA Tracker \u2014 Alerta*\n\n"
-        f"Tenant #{tenant_number} existe en DynamoDB pero no se "
-        f"encontro en tenant_mapping.\n\n"
-        f"\U0001f4e6 Guias pendientes: {len(tracking_numbers)}\n"
-        f"\U0001f4cb Tracking: {guides}\n\n"
-        f'*Accion requerida:* Sincronizar este tenant usando '
-        f"POST /admin/sync-tenants para agregarlo a la base de datos.\n\n"
-        f"\U0001f916 SonIA Tracker \u2014 {now}"
-    )
+    msg = _TENANT_NOT_FOUND_TEMPLATE.format_map({
+        "tenant_number": tenant_number,
+        "pending": len(tracking_numbers),
+        "guides": guides,
+        "now": now_str or _now_str(),
+    })
     _send_admin_alert(whatsapp, msg)
 
 
 def _alert_no_whatsapp_contacts(whatsapp: WhatsAppSender, tenant_name: str,
-                                 tenant_number: int, tracking_count: int):
+                                 tenant_number: int, tracking_count: int,
+                                 now_str: Optional[str] = None):
     """Alert admin: tenant has no WhatsApp contacts in tenant_mapping."""
-    now = datetime.now(COT).strftime("%d/%m/%Y %I:%M %p")
-    msg = (
-        f"\u26a0\ufe0f *SonIA Tracker \u2014 Alerta*\n\n"
-        f"El tenant {tenant_name} (#{tenant_number}) "
-        f"no tiene contactos con WhatsApp asignados.\n\n"
-        f"\U0001f4e6 Guias pendientes: {tracking_count}\n\n"
-        f"*Accion requerida:* Agregar contactos a este tenant "
-        f"usando POST /admin/sync-tenants.\n\n"
-        f"\U0001f916 SonIA Tracker \u2014 {now}"
-    )
+    msg = _NO_WHATSAPP_TEMPLATE.format_map({
+        "tenant_name": tenant_name,
+        "tenant_number": tenant_number,
+        "tracking_count": tracking_count,
+        "now": now_str or _now_str(),
+    })
     _send_admin_alert(whatsapp, msg)
 
 
 def _alert_flow_error(whatsapp: WhatsAppSender, tenant_number: Optional[int],
                        client_name: str, error_type: str, error_msg: str,
                        affected_count: int, total_count: int,
-                       scope: str = "Solo este cliente"):
+                       scope: str = "Solo este cliente",
+                       now_str: Optional[str] = None):
     """Alert admin: error during SonIA Tracker processing."""
-    now = datetime.now(COT).strftime("%d/%m/%Y %I:%M %p")
     client_label = f"{client_name} (Tenant #{tenant_number})" if tenant_number else client_name
-    msg = (
-        f"\U0001f6a8 *SonIA Tracker \u2014 Error*\n\n"
-        f"Se produjo un error durante el ciclo diario:\n\n"
-        f"\U0001f464 Cliente/Tenant: {client_label}\n"
-        f"\u274c Tipo de error: {error_type}\n"
-        f"\U0001f4e6 Guias afectadas: {affected_count}\n"
-        f"\U0001f4ca Total guias en ciclo: {total_count} (excluyendo entregadas)\n"
-        f"\U0001f504 Alcance: {scope}\n\n"
-        f"Detalle: {error_msg[:300]}\n\n"
-        f"\U0001f916 SonIA Tracker \u2014 {now}"
-    )
+    msg = _FLOW_ERROR_TEMPLATE.format_map({
+        "client_label": client_label,
+        "error_type": error_type,
+        "affected_count": affected_count,
+        "total_count": total_count,
+        "scope": scope,
+        "error_msg": error_msg[:300],
+        "now": now_str or _now_str(),
+    })
     _send_admin_alert(whatsapp, msg)
 
 
@@ -295,94 +593,77 @@ async def run_daily_flow(modules: dict):
 
     # Set running flag
     flow_progress["running"] = True
-    flow_progress["started_at"] = datetime.now(COT).isoformat()
+    flow_progress["started_at"] = datetime.now(COT)
     flow_progress["phase"] = "initializing"
     flow_progress["errors"] = []
+    flow_progress["tenants_done"] = 0
+    flow_progress["tenant_current"] = {}
+    flow_progress["packages_done"] = 0
 
     now = datetime.now(COT)
+    now_str = f"{now:%d/%m/%Y %I:%M %p}"
     logger.info(f"=== Starting daily flow at {now.strftime('%Y-%m-%d %H:%M:%S')} COT ===")
 
     # Create run log
-    run_id = db.create_run_log(now.date())
-    stats = {
-        "total_shipments_read": 0,
-        "tenants_found": 0,
-        "tenants_in_mapping": 0,
-        "tenants_missing_mapping": 0,
-        "tenants_no_whatsapp": 0,
-        "new_shipments": 0,
-        "shipments_checked": 0,
-        "shipments_updated": 0,
-        "shipments_delivered": 0,
-        "claims_created": 0,
-        "reports_generated": 0,
-        "reports_sent": 0,
-        "alerts_sent": 0,
-    }
-    errors = []
+    run_id = await _run_io(db.create_run_log, now.date())
+    stats = RunStats()
+    errors = RunErrors()
     total_active_packages = 0  # Total non-delivered packages across all tenants
 
     try:
         # ââ Step 1: Read from DynamoDB ââ
         flow_progress["phase"] = "reading_dynamodb"
         logger.info("Step 1: Reading shipments from DynamoDB...")
-        raw_shipments = []
+        # Reserves are streamed straight into the tenant grouping (Step 2)
+        # so the full scan is never held as a separate list
+        tenant_groups = {}
         if dynamo:
             try:
-                raw_shipments = dynamo.scan_all_reserves()
-                stats["total_shipments_read"] = len(raw_shipments)
-                logger.info(f"Read {len(raw_shipments)} reserves from DynamoDB")
+                tenant_groups, reserves_read, total_active_packages = await _run_io(
+                    _group_reserves, dynamo.iter_reserves()
+                )
+                stats.total_shipments_read = reserves_read
+                logger.info(f"Read {reserves_read} reserves from DynamoDB")
             except Exception as e:
                 logger.error(f"DynamoDB read error: {e}")
                 errors.append({"step": "dynamo_read", "error": str(e)})
-                _alert_flow_error(
+                await _run_io(
+                    _alert_flow_error,
                     whatsapp, None, "N/A", "Error leyendo DynamoDB",
-                    str(e), 0, 0, "Todo el flujo diario se detuvo"
+                    str(e), 0, 0, "Todo el flujo diario se detuvo",
+                    now_str=now_str,
                 )
-                stats["alerts_sent"] += 1
-                db.update_run_log(run_id, stats, errors, "failed")
+                stats.alerts_sent += 1
+                await _run_io(db.update_run_log, run_id, stats.as_dict(), errors.as_list(), "failed")
                 flow_progress["running"] = False
                 return
         else:
             logger.error("DynamoDB module not available")
-            _alert_flow_error(
+            await _run_io(
+                _alert_flow_error,
                 whatsapp, None, "N/A", "Modulo DynamoDB no disponible",
                 "DynamoReader no inicializado", 0, 0,
-                "Todo el flujo diario se detuvo"
+                "Todo el flujo diario se detuvo",
+                now_str=now_str,
             )
-            stats["alerts_sent"] += 1
-            db.update_run_log(run_id, stats, errors, "failed")
+            stats.alerts_sent += 1
+            await _run_io(db.update_run_log, run_id, stats.as_dict(), errors.as_list(), "failed")
             flow_progress["running"] = False
             return
 
-        if not raw_shipments:
+        if not stats.total_shipments_read:
             logger.info("No shipments found in DynamoDB. Nothing to process.")
-            db.update_run_log(run_id, stats, errors, "success")
+            await _run_io(db.update_run_log, run_id, stats.as_dict(), errors.as_list(), "success")
             flow_progress["running"] = False
             return
 
         # ââ Step 2: Group by tenant ââ
         flow_progress["phase"] = "grouping_by_tenant"
         logger.info("Step 2: Grouping shipments by tenant...")
-        tenant_groups = defaultdict(list)
-        for reserve in raw_shipments:
-            tenant_id = reserve.get("tenant")
-            if tenant_id is not None:
-                tenant_groups[int(tenant_id)].append(reserve)
-            else:
-                logger.warning(f"Reserve {reserve.get('id', '?')} has no tenant ID")
-
-        stats["tenants_found"] = len(tenant_groups)
+        stats.tenants_found = len(tenant_groups)
         flow_progress["tenant_total"] = len(tenant_groups)
         logger.info(f"Found {len(tenant_groups)} unique tenants: {list(tenant_groups.keys())}")
 
-        # Count total active (non-delivered) packages across all tenants
-        for tenant_id, reserves in tenant_groups.items():
-            for reserve in reserves:
-                for pkg in reserve.get("packages", []):
-                    if pkg.get("status", "").lower() != "delivered":
-                        total_active_packages += 1
-
         flow_progress["packages_total"] = total_active_packages
 
         #  Step 3: Load tenant data from Odoo spreadsheet 
@@ -393,11 +674,11 @@ async def run_daily_flow(modules: dict):
             if not odoo:
                 raise Exception("Odoo module not available")
 
-            auth_ok = odoo.authenticate()
+            auth_ok = await _run_io(odoo.authenticate)
             if not auth_ok:
                 raise Exception("Odoo authentication failed")
 
-            bbdd = odoo.get_whatsapp_bbdd(config.ODOO_SPREADSHEET_ID)
+            bbdd = await _run_io(odoo.get_whatsapp_bbdd, config.ODOO_SPREADSHEET_ID)
             odoo_tenant_names = bbdd.get("tenant_mapping", {})
             odoo_contacts = bbdd.get("contacts", [])
 
@@ -406,15 +687,18 @@ async def run_daily_flow(modules: dict):
 
             # Build tenant_mapping in expected format:
             # {tenant_id: {"tenant_name": name, "whatsapp_numbers": [...]}}
+            # OdooClient already parses tenant numbers to int, matching the
+            # int tenant IDs DynamoReader yields.
+            numbers_by_tenant: Dict[int, List[str]] = {}
+            for c in odoo_contacts:
+                tnum = c.get("tenant_number")
+                if tnum is not None and c.get("whatsapp"):
+                    numbers_by_tenant.setdefault(tnum, []).append(c["whatsapp"])
             tenant_mapping = {}
             for tid, tname in odoo_tenant_names.items():
-                whatsapp_nums = [
-                    c["whatsapp"] for c in odoo_contacts
-                    if c.get("tenant_number") == tid and c.get("whatsapp")
-                ]
                 tenant_mapping[tid] = {
                     "tenant_name": tname,
-                    "whatsapp_numbers": whatsapp_nums,
+                    "whatsapp_numbers": numbers_by_tenant.get(tid, []),
                 }
 
             logger.info(
@@ -424,13 +708,15 @@ async def run_daily_flow(modules: dict):
         except Exception as e:
             logger.error(f"Error loading Odoo spreadsheet: {e}")
             errors.append({"step": "load_odoo_spreadsheet", "error": str(e)})
-            _alert_flow_error(
+            await _run_io(
+                _alert_flow_error,
                 whatsapp, None, "N/A", "Error leyendo spreadsheet Odoo",
                 str(e), total_active_packages, total_active_packages,
-                "Todo el flujo diario se detuvo"
+                "Todo el flujo diario se detuvo",
+                now_str=now_str,
             )
-            stats["alerts_sent"] += 1
-            db.update_run_log(run_id, stats, errors, "failed")
+            stats.alerts_sent += 1
+            await _run_io(db.update_run_log, run_id, stats.as_dict(), errors.as_list(), "failed")
             flow_progress["running"] = False
             return
 
@@ -438,85 +724,112 @@ async def run_daily_flow(modules: dict):
         flow_progress["phase"] = "processing_tenants"
         logger.info("Step 4: Processing tenants...")
         tenant_list = list(tenant_groups.items())
-        for tenant_index, (tenant_id, reserves) in enumerate(tenant_list):
-            flow_progress["tenant_index"] = tenant_index
-            flow_progress["tenant_current"] = str(tenant_id)
+        tenant_semaphore = asyncio.Semaphore(config.TENANT_CONCURRENCY)
+        tenant_shipments: Dict[str, List[Dict]] = {}  # reused by the consolidated report
+        fedex_cache: Dict[str, Dict] = {}  # tracking_number -> FedEx result, for this run
+        # DB tenant -> client rows, read once for every tenant instead of per tenant
+        client_mapping = await _run_io(db.get_tenant_mapping_cached)
+
+        async def _run_tenant(tenant_id: int, reserves: List[Dict]):
+            # Each tenant counts into its own dict, merged once it finishes,
+            # so concurrent tenants never interleave updates to `stats`
+            tenant_stats = RunStats()
+            async with tenant_semaphore:
+                flow_progress["tenant_current"][tenant_id] = {
+                    "name": f"Tenant #{tenant_id}",
+                    "phase": "starting",
+                }
 
-            try:
-                # Get tenant info from mapping
-                tenant_info = tenant_mapping.get(tenant_id)
-                if not tenant_info:
-                    logger.warning(f"Tenant #{tenant_id} not found in tenant_mapping!")
-                    tracking_numbers = []
-                    for reserve in reserves:
-                        for pkg in reserve.get("packages", []):
-                            tn = pkg.get("tracking_number", "")
-                            if tn:
-                                tracking_numbers.append(tn)
-                    _alert_tenant_not_found(whatsapp, tenant_id, tracking_numbers)
-                    stats["tenants_missing_mapping"] += 1
-                    stats["alerts_sent"] += 1
-                    continue
-
-                tenant_name = tenant_info.get("tenant_name", f"Tenant #{tenant_id}")
-                whatsapp_numbers = tenant_info.get("whatsapp_numbers", [])
-                stats["tenants_in_mapping"] += 1
-
-                await _process_tenant(
-                    tenant_id=tenant_id,
-                    tenant_name=tenant_name,
-                    whatsapp_numbers=whatsapp_numbers,
-                    reserves=reserves,
-                    modules=modules,
-                    stats=stats,
-                    errors=errors,
-                    total_active_packages=total_active_packages,
-                )
-            except Exception as e:
-                logger.error(f"Critical error processing tenant #{tenant_id}: {e}")
-                tb = traceback.format_exc()
-                logger.error(tb)
+                try:
+                    # Get tenant info from mapping
+                    tenant_info = tenant_mapping.get(tenant_id)
+                    if not tenant_info:
+                        logger.warning(f"Tenant #{tenant_id} not found in tenant_mapping!")
+                        tracking_numbers = []
+                        for reserve in reserves:
+                            for pkg in reserve.get("packages", []):
+                                tn = pkg.get("tracking_number", "")
+                                if tn:
+                                    tracking_numbers.append(tn)
+                        await _run_io(_alert_tenant_not_found, whatsapp, tenant_id, tracking_numbers, now_str)
+                        tenant_stats.tenants_missing_mapping += 1
+                        tenant_stats.alerts_sent += 1
+                        return
+
+                    tenant_name = tenant_info.get("tenant_name", f"Tenant #{tenant_id}")
+                    whatsapp_numbers = tenant_info.get("whatsapp_numbers", [])
+                    tenant_stats.tenants_in_mapping += 1
+
+                    shipments = await _process_tenant(
+                        tenant_id=tenant_id,
+                        tenant_name=tenant_name,
+                        whatsapp_numbers=whatsapp_numbers,
+                        reserves=reserves,
+                        modules=modules,
+                        stats=tenant_stats,
+                        errors=errors,
+                        total_active_packages=total_active_packages,
+                        now_str=now_str,
+                        fedex_cache=fedex_cache,
+                        client_mapping=client_mapping,
+                    )
+                    if shipments:
+                        tenant_shipments[tenant_name] = shipments
+                except Exception as e:
+                    logger.error(f"Critical error processing tenant #{tenant_id}: {e}")
+                    tb = traceback.format_exc()
+                    logger.error(tb)
+                    errors.append({
+                        "step": f"process_tenant_{tenant_id}",
+                        "error": str(e),
+                        "traceback": tb[:500],
+                    })
+
+                    # Count affected packages for this tenant
+                    tenant_pkgs = sum(
+                        len(r.get("packages", [])) for r in reserves
+                    )
+                    await _run_io(
+                        _alert_flow_error,
+                        whatsapp, tenant_id, f"Tenant #{tenant_id}",
+                        "Error critico procesando tenant",
+                        str(e), tenant_pkgs, total_active_packages,
+                        "Solo este cliente",
+                        now_str=now_str,
+                    )
+                    tenant_stats.alerts_sent += 1
+                finally:
+                    stats.merge(tenant_stats)
+                    flow_progress["tenant_current"].pop(tenant_id, None)
+                    flow_progress["tenants_done"] += 1
+
+        # Tenants are independent, so process them concurrently (bounded)
+        results = await asyncio.gather(
+            *(_run_tenant(tenant_id, reserves) for tenant_id, reserves in tenant_list),
+            return_exceptions=True,
+        )
+        for (tenant_id, _), result in zip(tenant_list, results):
+            if isinstance(result, BaseException):
+                logger.error(f"Unhandled error processing tenant #{tenant_id}: {result!r}")
                 errors.append({
                     "step": f"process_tenant_{tenant_id}",
-                    "error": str(e),
-                    "traceback": tb[:500],
+                    "error": str(result),
                 })
 
-                # Count affected packages for this tenant
-                tenant_pkgs = sum(
-                    len(r.get("packages", [])) for r in reserves
-                )
-                _alert_flow_error(
-                    whatsapp, tenant_id, f"Tenant #{tenant_id}",
-                    "Error critico procesando tenant",
-                    str(e), tenant_pkgs, total_active_packages,
-                    "Solo este cliente"
-                )
-                stats["alerts_sent"] += 1
-
         # ── Generate consolidated Excel report ──
         excel_gen = modules.get("excel_gen")
         if excel_gen and db:
             try:
-                all_shipments = {}
-                for tid, reserves in tenant_groups.items():
-                    t_info = tenant_mapping.get(tid)
-                    if t_info:
-                        t_name = t_info.get("tenant_name", f"Tenant #{tid}")
-                        client_db_id = t_info.get("client_db_id")
-                        if client_db_id:
-                            rows = db.get_shipments_by_client(client_db_id)
-                            if rows:
-                                all_shipments[t_name] = [dict(r) for r in rows]
-                if all_shipments:
-                    consolidated_path = excel_gen.generate_consolidated_report(all_shipments)
+                if tenant_shipments:
+                    consolidated_path = await _run_io(excel_gen.generate_consolidated_report, tenant_shipments)
                     if consolidated_path:
-                        stats["consolidated_excel"] = consolidated_path
+                        stats.consolidated_excel = consolidated_path
                         logger.info(f"Consolidated Excel report: {consolidated_path}")
-                        # Send consolidated to admin
-                        if whatsapp and config.ADMIN_WHATSAPP:
+                        # Send consolidated to admin (opt-in)
+                        if config.SEND_CONSOLIDATED_REPORT and whatsapp and config.ADMIN_WHATSAPP:
                             try:
-                                whatsapp.send_file_sync(
+                                await _run_io(
+                                    whatsapp.send_file_sync,
                                     phone_number=config.ADMIN_WHATSAPP,
                                     file_path=consolidated_path,
                                     caption="SonIA Tracker - Reporte Consolidado",
@@ -531,22 +844,23 @@ async def run_daily_flow(modules: dict):
         # ââ Finalize ââ
         flow_progress["phase"] = "finalizing"
         status = "success" if not errors else "partial"
-        db.update_run_log(run_id, stats, errors, status)
+        await _run_io(db.update_run_log, run_id, stats.as_dict(), errors.as_list(), status)
         logger.info(f"=== Daily flow completed: {status} | Stats: {stats} ===")
 
         # Send admin summary if there were errors
         if errors:
-            now_str = datetime.now(COT).strftime("%d/%m/%Y %I:%M %p")
-            summary = (
-                f"\U0001f4ca *SonIA Tracker \u2014 Resumen Diario*\n\n"
-                f"Estado: {'Parcial' if status == 'partial' else 'Fallido'}\n"
-                f"Errores: {len(errors)}\n"
-                f"Tenants procesados: {stats['tenants_in_mapping']}/{stats['tenants_found']}\n"
-                f"Reportes enviados: {stats['reports_sent']}\n"
-                f"Alertas enviadas: {stats['alerts_sent']}\n\n"
-                f"\U0001f916 SonIA Tracker \u2014 {now_str}"
-            )
-            _send_admin_alert(whatsapp, summary)
+            kept = len(errors.recent)
+            summary = _DAILY_SUMMARY_TEMPLATE.format_map({
+                "status_label": "Parcial" if status == "partial" else "Fallido",
+                "error_count": errors.count,
+                "errors_kept": f" (ultimos {kept} guardados)" if errors.count > kept else "",
+                "tenants_in_mapping": stats.tenants_in_mapping,
+                "tenants_found": stats.tenants_found,
+                "reports_sent": stats.reports_sent,
+                "alerts_sent": stats.alerts_sent,
+                "now": now_str,
+            })
+            await _run_io(_send_admin_alert, whatsapp, summary)
 
     except Exception as e:
         logger.error(f"Daily flow critical error: {e}")
@@ -554,11 +868,13 @@ async def run_daily_flow(modules: dict):
         logger.error(tb)
         if db and run_id:
             errors.append({"step": "critical", "error": str(e)})
-            db.update_run_log(run_id, stats, errors, "failed")
-        _alert_flow_error(
+            await _run_io(db.update_run_log, run_id, stats.as_dict(), errors.as_list(), "failed")
+        await _run_io(
+            _alert_flow_error,
             whatsapp, None, "N/A", "Error critico en flujo diario",
             str(e), total_active_packages, total_active_packages,
-            "Todo el flujo diario se detuvo"
+            "Todo el flujo diario se detuvo",
+            now_str=now_str,
         )
     finally:
         # Always clear running flag
@@ -566,9 +882,80 @@ async def run_daily_flow(modules: dict):
         flow_progress["phase"] = "idle"
 
 
+def _group_reserves(reserves: Iterable[Dict], count_active: bool = True) -> tuple:
+    """
+    Single pass over streamed reserves: group by tenant and count active
+    (non-delivered) packages. Returns (tenant_groups, reserves_read, active_packages).
+    With count_active=False the package walk is skipped and active_packages is 0.
+    """
+    # Map each tenant to its list's bound append, so the hot path is a single
+    # dict lookup + call; a new tenant is the only case that builds a list
+    appenders = {}
+    reserves_read = 0
+    active_packages = 0
+    for reserve in reserves:
+        reserves_read += 1
+        get = reserve.get
+        tenant_id = get("tenant")
+        if tenant_id is None:
+            logger.warning(f"Reserve {get('id', '?')} has no tenant ID")
+            continue
+        # DynamoReader already parses "tenant" as an int (_get_n)
+        try:
+            appenders[tenant_id](reserve)
+        except KeyError:
+            group = [reserve]
+            appenders[tenant_id] = group.append
+        if count_active:
+            for pkg in get("packages") or ():
+                if not pkg["delivered"]:
+                    active_packages += 1
+    tenant_groups = {key: append.__self__ for key, append in appenders.items()}
+    return tenant_groups, reserves_read, active_packages
+
+
+def _apply_fedex_results(db: DBManager, results: Dict[str, Dict]) -> tuple:
+    """
+    Write one FedEx batch to the DB in one statement.
+    Returns (updated, delivered, changed) counts; changed excludes rows where
+    only the check bookkeeping moved.
+    """
+    tracked = {tn: data for tn, data in results.items() if not data.get("error")}
+    updated, changed = db.update_shipments_from_fedex_bulk(tracked)
+    return len(updated), sum(updated.values()), changed
+
+
+def _detect_and_claim(db: DBManager, anomaly_detector: AnomalyDetector, client_db_id: int,
+                      client_shipments: List[Dict]) -> int:
+    """Run anomaly rules over a client's shipments and open claims. Returns claims created."""
+    if not client_shipments:
+        return 0
+    anomalies = anomaly_detector.check_all_shipments(client_shipments)
+    claim_ids = db.create_proactive_claims_bulk([
+        {
+            "tracking_number": anomaly["tracking_number"],
+            "shipment_id": anomaly.get("shipment_id"),
+            "client_id": client_db_id,
+            "claim_type": anomaly["claim_type"],
+            "description": anomaly["description"],
+            "rule": anomaly["rule"],
+        }
+        for anomaly in anomalies
+    ])
+    return len(claim_ids)
+
+
+# tenant_id -> COT date of the last anomaly pass, to skip same-day reruns
+# for tenants whose shipments didn't change in between
+_anomaly_pass_day: Dict[int, Any] = {}
+
+
 async def _process_tenant(tenant_id: int, tenant_name: str, whatsapp_numbers: List[str],
-                           reserves: List[Dict], modules: dict, stats: dict, errors: list,
-                           total_active_packages: int):
+                           reserves: List[Dict], modules: dict, stats: RunStats, errors: RunErrors,
+                           total_active_packages: int,
+                           now_str: Optional[str] = None,
+                           fedex_cache: Optional[Dict[str, Dict]] = None,
+                           client_mapping: Optional[Dict[int, Dict]] = None) -> List[Dict]:
     """
     Process all reserves for a single tenant:
     1. Extract tracking numbers (skip delivered)
@@ -576,6 +963,13 @@ async def _process_tenant(tenant_id: int, tenant_name: str, whatsapp_numbers: Li
     3. Query FedEx for active shipments
     4. Detect anomalies
     5. Generate and send report
+
+    Returns the tenant's shipments as loaded after the FedEx updates.
+
+    fedex_cache, when given, is shared by every tenant in the run: tracking
+    numbers already answered by FedEx (and written to the DB) are not queried
+    again. client_mapping is the DB tenant mapping loaded once by the caller;
+    without it the (cached) mapping is read here.
     """
     global flow_progress
 
@@ -584,126 +978,176 @@ async def _process_tenant(tenant_id: int, tenant_name: str, whatsapp_numbers: Li
     anomaly_detector = modules.get("anomaly")
     report_gen = modules.get("reports")
     whatsapp = modules.get("whatsapp")
+    excel_gen = modules.get("excel_gen")
+    now_str = now_str or _now_str()
 
     logger.info(f"--- Processing Tenant #{tenant_id}: {tenant_name} ({len(reserves)} reserves) ---")
-    flow_progress["tenant_current"] = f"{tenant_name} (#{tenant_id})"
-
-    # ââ Get delivered tracking numbers from shipments table ââ
-    delivered_tracking = set()
-    try:
-        undelivered = db.get_undelivered_shipments()
-        # Complement set: all shipments minus undelivered = delivered
-        if undelivered:
-            all_tn = set()
-            for reserve in reserves:
-                for pkg in reserve.get("packages", []):
-                    tn = pkg.get("tracking_number", "")
-                    if tn:
-                        all_tn.add(tn)
-            undelivered_set = set(s.get("tracking_number") for s in undelivered if s.get("tracking_number"))
-            delivered_tracking = all_tn - undelivered_set
-    except Exception as e:
-        logger.warning(f"Could not load delivered shipments: {e}")
-
-    # Collect all tracking numbers from packages
-    all_tracking = []
-    active_tracking = []
-    for reserve in reserves:
-        for pkg in reserve.get("packages", []):
-            tn = pkg.get("tracking_number", "")
-            if tn:
-                all_tracking.append(tn)
-                # Skip if already delivered
-                if tn not in delivered_tracking and pkg.get("status", "").lower() != "delivered":
-                    active_tracking.append(tn)
-
-    logger.info(f"Tenant #{tenant_id}: {len(all_tracking)} total packages, {len(active_tracking)} active, {len(delivered_tracking)} already delivered")
+    # This tenant's own progress entry (a throwaway dict outside a daily run)
+    progress = flow_progress["tenant_current"].get(tenant_id, {})
+    progress["name"] = tenant_name
+    progress["phase"] = "storing_shipments"
+    # New shipments plus FedEx updates that changed a status/date, counted
+    # per call so a test-flow rerun with a caller-owned RunStats skips too
+    tenant_changes = 0
 
     # ââ Store shipments in PostgreSQL ââ
     # Get or create client in DB
-    client_info = db.get_client_by_tenant(tenant_id)
+    if client_mapping is None:
+        client_mapping = await _run_io(db.get_tenant_mapping_cached)
+    client_info = client_mapping.get(tenant_id)
+    if client_info is None:
+        # Not in the cached mapping (yet): fall back to a direct lookup
+        client_info = await _run_io(db.get_client_by_tenant, tenant_id)
     client_db_id = client_info.get("client_id") if client_info else None
 
+    # Collect all tracking numbers from packages, in one pass with the upsert rows
+    all_tracking = []
+    pending_tracking = []  # not delivered according to DynamoDB
+    shipment_rows = []  # one bulk upsert per tenant instead of one round-trip per package
+    add_tracking, add_pending, add_row = all_tracking.append, pending_tracking.append, shipment_rows.append
     for reserve in reserves:
-        for pkg in reserve.get("packages", []):
-            tn = pkg.get("tracking_number", "")
+        for pkg in reserve.get("packages") or ():
+            tn = pkg["tracking_number"]  # DynamoReader always sets the key
             if not tn:
                 continue
+            add_tracking(tn)
+            if not pkg["delivered"]:
+                add_pending(tn)
+            add_row({
+                "tracking_number": tn,
+                "client_id": client_db_id,
+                "client_name_raw": tenant_name,
+                "dynamo_data": reserve,
+            })
+
+    # ââ Get delivered tracking numbers from shipments table ââ
+    # Skip the ones the DB already has as delivered; only this tenant's
+    # numbers are looked up (index seek), not the whole shipments table
+    delivered_tracking = set()
+    if pending_tracking:
+        try:
+            delivered_tracking = await _run_io(db.get_delivered_in, pending_tracking)
+        except Exception as e:
+            logger.warning(f"Could not load delivered shipments: {e}")
+    active_tracking = [tn for tn in pending_tracking if tn not in delivered_tracking]
+
+    logger.info(f"Tenant #{tenant_id}: {len(all_tracking)} total packages, {len(active_tracking)} active, {len(delivered_tracking)} already delivered")
+
+    if shipment_rows:
+        try:
+            inserted = await _run_io(db.upsert_shipments_bulk, shipment_rows)
+            stats.new_shipments += inserted
+            tenant_changes += inserted
+        except Exception as e:
+            logger.error(f"DB bulk upsert error for tenant #{tenant_id}: {e}")
+
+    # Nothing left in transit: no FedEx calls, anomaly rules or report needed.
+    # ALWAYS_REPORT forces the full pass (e.g. for a weekly digest).
+    if not active_tracking and not config.ALWAYS_REPORT:
+        logger.info(f"Tenant #{tenant_id}: no active packages - skipping downstream")
+        stats.tenants_skipped_quiet += 1
+        client_shipments = []
+        if client_db_id:
             try:
-                inserted = db.upsert_shipment({
-                    "tracking_number": tn,
-                    "client_id": client_db_id,
-                    "client_name_raw": tenant_name,
-                    "dynamo_data": reserve,
-                })
-                if inserted:
-                    stats["new_shipments"] += 1
+                # Still returned so the consolidated Excel covers this tenant
+                client_shipments = await _run_io(db.get_shipments_by_client, client_db_id)
             except Exception as e:
-                logger.error(f"DB upsert error for {tn}: {e}")
+                logger.error(f"Shipment load error for tenant #{tenant_id}: {e}")
+        return client_shipments
 
     # Check if we have WhatsApp contacts
     if not whatsapp_numbers:
         logger.warning(f"No WhatsApp contacts for {tenant_name} (Tenant #{tenant_id})")
-        _alert_no_whatsapp_contacts(whatsapp, tenant_name, tenant_id, len(active_tracking))
-        stats["tenants_no_whatsapp"] += 1
-        stats["alerts_sent"] += 1
+        await _run_io(_alert_no_whatsapp_contacts, whatsapp, tenant_name, tenant_id, len(active_tracking), now_str)
+        stats.tenants_no_whatsapp += 1
+        stats.alerts_sent += 1
 
     # ââ Query FedEx for active tracking numbers ââ
-    if fedex and active_tracking:
-        logger.info(f"Querying FedEx for {len(active_tracking)} active packages...")
-        batch_size = 30
-        for i in range(0, len(active_tracking), batch_size):
-            batch = active_tracking[i:i + batch_size]
+    # Re-labels can repeat a tracking number, and tenants may share one
+    to_track = list(dict.fromkeys(active_tracking))
+    if fedex_cache is not None:
+        to_track = [tn for tn in to_track if tn not in fedex_cache]
+        if len(to_track) < len(active_tracking):
+            logger.info(
+                f"Tenant #{tenant_id}: {len(active_tracking) - len(to_track)} "
+                f"tracking numbers already checked this run"
+            )
+    if fedex and to_track:
+        logger.info(f"Querying FedEx for {len(to_track)} active packages...")
+        progress["phase"] = "tracking_fedex"
+        batch_size = config.FEDEX_BATCH_SIZE
+        batches = [to_track[i:i + batch_size]
+                   for i in range(0, len(to_track), batch_size)]
+        async def _track_and_apply(batch_num: int, batch: List[str]):
+            nonlocal tenant_changes
+            # Each batch is written as soon as FedEx answers it, overlapping
+            # DB writes with the batches still in flight
             try:
-                results = fedex.track_multiple(batch)
-                stats["shipments_checked"] += len(batch)
-
-                for tracking_num, fedex_data in results.items():
-                    if fedex_data.get("error"):
-                        continue
-                    updated = db.update_shipment_from_fedex(
-                        tracking_number=tracking_num,
-                        fedex_data=fedex_data,
+                results = await fedex.track_batch_async(batch)
+                if fedex_cache is not None:
+                    fedex_cache.update(
+                        (tn, data) for tn, data in results.items() if not data.get("error")
                     )
-                    if updated:
-                        stats["shipments_updated"] += 1
-                        if fedex_data.get("is_delivered"):
-                            stats["shipments_delivered"] += 1
-                            flow_progress["packages_done"] += 1
+                stats.shipments_checked += len(batch)
+
+                updated, delivered, changed = await _run_io(
+                    _apply_fedex_results, db, results
+                )
+                tenant_changes += changed
+                stats.shipments_updated += updated
+                stats.shipments_delivered += delivered
+                flow_progress["packages_done"] += delivered
             except Exception as e:
                 logger.error(f"FedEx batch error for tenant #{tenant_id}: {e}")
                 errors.append({
                     "step": f"fedex_track_tenant_{tenant_id}",
                     "error": str(e),
-                    "batch_index": i,
+                    "batch_index": batch_num * batch_size,
                 })
-                _alert_flow_error(
+                await _run_io(
+                    _alert_flow_error,
                     whatsapp, tenant_id, tenant_name,
                     "Error consultando FedEx",
                     str(e), len(batch), total_active_packages,
-                    "Solo este cliente"
+                    "Solo este cliente",
+                    now_str=now_str,
                 )
-                stats["alerts_sent"] += 1
+                stats.alerts_sent += 1
+
+        await asyncio.gather(
+            *(_track_and_apply(n, batch) for n, batch in enumerate(batches))
+        )
+
+    # ── Load the tenant's shipments once (after FedEx updates) ──
+    # Anomalies, the WhatsApp report and the Excel report all read this list
+    client_shipments: List[Dict] = []
+    if client_db_id:
+        try:
+            client_shipments = await _run_io(db.get_shipments_by_client, client_db_id)
+        except Exception as e:
+            logger.error(f"Shipment load error for tenant #{tenant_id}: {e}")
+            errors.append({
+                "step": f"load_shipments_tenant_{tenant_id}",
+                "error": str(e),
+            })
 
     # ââ Detect anomalies ââ
-    if anomaly_detector and client_db_id:
+    async def _run_anomalies():
+        if not (anomaly_detector and client_db_id):
+            return
+        # Rules are day-based, so only a rerun on the same day with no new
+        # shipments and no FedEx status/date changes would find exactly the
+        # same claims
+        today = datetime.now(COT).date()
+        if not tenant_changes and _anomaly_pass_day.get(tenant_id) == today:
+            logger.info(f"Tenant #{tenant_id}: no changes since today's anomaly pass - skipping")
+            return
         try:
-            client_shipments = db.get_shipments_by_client(client_db_id)
-            if client_shipments:
-                shipment_dicts = [dict(s) for s in client_shipments]
-                anomalies = anomaly_detector.check_all_shipments(shipment_dicts)
-
-                for anomaly in anomalies:
-                    claim_id = db.create_proactive_claim(
-                        tracking_number=anomaly["tracking_number"],
-                        shipment_id=anomaly.get("shipment_id"),
-                        client_id=client_db_id,
-                        claim_type=anomaly["claim_type"],
-                        description=anomaly["description"],
-                        rule=anomaly["rule"],
-                    )
-                    if claim_id:
-                        stats["claims_created"] += 1
+            claims = await _run_io(
+                _detect_and_claim, db, anomaly_detector, client_db_id, client_shipments
+            )
+            stats.claims_created += claims
+            _anomaly_pass_day[tenant_id] = today
         except Exception as e:
             logger.error(f"Anomaly detection error for tenant #{tenant_id}: {e}")
             errors.append({
@@ -712,137 +1156,204 @@ async def _process_tenant(tenant_id: int, tenant_name: str, whatsapp_numbers: Li
             })
 
     # ââ Generate report ââ
-    if report_gen and client_db_id:
+    async def _build_report() -> Optional[str]:
+        if not (report_gen and client_db_id):
+            return None
         try:
-            client_shipments = db.get_shipments_by_client(client_db_id)
             if client_shipments:
-                report = report_gen.generate_client_report(
+                report = await _run_io(
+                    report_gen.generate_client_report,
                     client_name=tenant_name,
-                    shipments=[dict(s) for s in client_shipments],
+                    shipments=client_shipments,
                 )
-                stats["reports_generated"] += 1
-
-                # ââ Send report via WhatsApp ââ
-                if whatsapp and whatsapp_numbers:
-                    for phone_number in whatsapp_numbers:
-                        try:
-                            sent = whatsapp.send_report_sync(
-                                phone_number=phone_number,
-                                report_text=report,
-                                client_name=tenant_name,
-                            )
-                            if sent:
-                                stats["reports_sent"] += 1
-                                logger.info(
-                                    f"Report sent to {phone_number} for {tenant_name}"
-                                )
-                        except Exception as e:
-                            logger.error(
-                                f"WhatsApp send error to {phone_number}: {e}"
-                            )
-                            errors.append({
-                                "step": f"whatsapp_send_tenant_{tenant_id}",
-                                "phone": phone_number,
-                                "error": str(e),
-                            })
-                            _alert_flow_error(
-                                whatsapp, tenant_id, tenant_name,
-                                "Error enviando reporte WhatsApp",
-                                f"Numero: {phone_number} - {str(e)}",
-                                len(active_tracking), total_active_packages,
-                                "Solo este cliente"
-                            )
-                            stats["alerts_sent"] += 1
+                stats.reports_generated += 1
+                return report
         except Exception as e:
             logger.error(f"Report generation error for tenant #{tenant_id}: {e}")
             errors.append({
                 "step": f"report_gen_tenant_{tenant_id}",
                 "error": str(e),
             })
+        return None
 
+    # Both only read the tenant's shipments after FedEx updates, so overlap them
+    progress["phase"] = "building_report"
+    _, report = await asyncio.gather(_run_anomalies(), _build_report())
+
+    # ââ Send report via WhatsApp ââ
+    progress["phase"] = "sending_report"
+
+    async def _send_report(phone_number: str):
+        try:
+            sent = await whatsapp.send_report_async(
+                phone_number=phone_number,
+                report_text=report,
+                client_name=tenant_name,
+            )
+            if sent:
+                stats.reports_sent += 1
+                logger.info(
+                    f"Report sent to {phone_number} for {tenant_name}"
+                )
+        except Exception as e:
+            logger.error(
+                f"WhatsApp send error to {phone_number}: {e}"
+            )
+            errors.append({
+                "step": f"whatsapp_send_tenant_{tenant_id}",
+                "phone": phone_number,
+                "error": str(e),
+            })
+            await _run_io(
+                _alert_flow_error,
+                whatsapp, tenant_id, tenant_name,
+                "Error enviando reporte WhatsApp",
+                f"Numero: {phone_number} - {str(e)}",
+                len(active_tracking), total_active_packages,
+                "Solo este cliente",
+                now_str=now_str,
+            )
+            stats.alerts_sent += 1
+
+    if report and whatsapp and whatsapp_numbers:
+        # Each contact is an independent HTTP call, so send them concurrently
+        # over the sender's shared keep-alive AsyncClient
+        await asyncio.gather(*(_send_report(n) for n in whatsapp_numbers))
 
     # ── Generate Excel report per tenant ──
-    excel_gen = modules.get("excel_gen")
     if excel_gen and client_db_id:
+        progress["phase"] = "excel_report"
         try:
-            client_shipments_for_excel = db.get_shipments_by_client(client_db_id)
-            if client_shipments_for_excel:
-                shipment_dicts_excel = [dict(s) for s in client_shipments_for_excel]
-                excel_path = excel_gen.generate_tenant_report(
+            if client_shipments:
+                excel_path = await _run_io(
+                    excel_gen.generate_tenant_report,
                     tenant_name=tenant_name,
-                    shipments=shipment_dicts_excel,
+                    shipments=client_shipments,
                 )
                 if excel_path:
-                    stats["excel_reports_generated"] = stats.get("excel_reports_generated", 0) + 1
+                    stats.excel_reports_generated += 1
                     logger.info(f"Excel report generated for {tenant_name}: {excel_path}")
 
                     # Send Excel via WhatsApp to tenant contacts
+                    async def _send_excel(phone_number: str):
+                        try:
+                            sent = await _run_io(
+                                whatsapp.send_file_sync,
+                                phone_number=phone_number,
+                                file_path=excel_path,
+                                caption=f"SonIA Tracker - Reporte {tenant_name}",
+                            )
+                            if sent:
+                                stats.excel_reports_sent += 1
+                        except Exception as e:
+                            logger.error(f"Error sending Excel to {phone_number}: {e}")
+
                     if whatsapp and whatsapp_numbers:
-                        for phone_number in whatsapp_numbers:
-                            try:
-                                sent = whatsapp.send_file_sync(
-                                    phone_number=phone_number,
-                                    file_path=excel_path,
-                                    caption=f"SonIA Tracker - Reporte {tenant_name}",
-                                )
-                                if sent:
-                                    stats["excel_reports_sent"] = stats.get("excel_reports_sent", 0) + 1
-                            except Exception as e:
-                                logger.error(f"Error sending Excel to {phone_number}: {e}")
+                        await asyncio.gather(*(_send_excel(n) for n in whatsapp_numbers))
         except Exception as e:
             logger.error(f"Excel generation error for tenant #{tenant_id}: {e}")
 
     logger.info(f"--- Tenant #{tenant_id} ({tenant_name}) processing complete ---")
+    return client_shipments
 
 
 # ============================================================================
 # FASTAPI APP
 # ============================================================================
 
-scheduler = AsyncIOScheduler()
-modules = {}
+modules = LazyModules()
 
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    """Startup and shutdown."""
-    global modules
+def _next_run_at(now: datetime, hour: int) -> datetime:
+    """Next occurrence of hour:00 COT strictly after `now`."""
+    run_at = now.astimezone(COT).replace(hour=hour, minute=0, second=0, microsecond=0)
+    if run_at <= now:
+        run_at += timedelta(days=1)
+    return run_at
+
+
+# Longest single sleep in the daily loop. asyncio.sleep runs on the monotonic
+# clock, so a day-long sleep drifts from wall time (host suspend, NTP steps);
+# waking hourly re-aims at the real run_hour:00 COT
+_DAILY_LOOP_MAX_SLEEP = 3600.0
+
+
+async def _daily_loop(modules: "LazyModules", run_hour: int,
+                      db_ready: Optional[asyncio.Task] = None):
+    """Sleep until the next run_hour:00 COT, run the daily flow, repeat."""
+    if db_ready is not None:
+        # Never start a run against a schema that is still migrating
+        await asyncio.wait({db_ready})
+    while True:
+        run_at = _next_run_at(datetime.now(COT), run_hour)
+        logger.info(f"Next daily flow at {run_at.isoformat()}")
+        while (remaining := (run_at - datetime.now(COT)).total_seconds()) > 0:
+            await asyncio.sleep(min(remaining, _DAILY_LOOP_MAX_SLEEP))
+        try:
+            await run_daily_flow(modules)
+        except Exception as e:
+            # Keep the loop alive; tomorrow's run should still happen
+            logger.error(f"Daily flow crashed: {e}\n{traceback.format_exc()}")
 
-    # Run migration
+
+async def _prepare_database():
+    """Run migrations, then open and probe the pool's idle connections."""
     logger.info("Running database migration check...")
-    run_migration()
+    await _run_io(run_migration)
+    db = modules.get("db")
+    if db:
+        await _run_io(db.warm_pool)
+
 
-    # Initialize modules
-    logger.info("Initializing modules...")
-    modules = init_modules()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Startup and shutdown."""
+    # Migrations run in the background on the io pool, so the server is
+    # already answering health probes while they finish
+    db_task = asyncio.create_task(_prepare_database(), name="prepare_database")
 
-    # Schedule daily job
+    # Schedule daily job; modules are built lazily when first used (get_module)
     run_hour = config.RUN_HOUR_COT
-    scheduler.add_job(
-        run_daily_flow,
-        CronTrigger(hour=run_hour, minute=0, timezone=COT),
-        args=[modules],
-        id="daily_flow",
-        name=f"SonIA Daily Flow ({run_hour}:00 COT)",
-        replace_existing=True,
-    )
-    scheduler.start()
+    daily_task = asyncio.create_task(_daily_loop(modules, run_hour, db_task), name="daily_flow")
     logger.info(f"Scheduler started - daily flow at {run_hour}:00 COT")
 
     yield
 
     # Shutdown
-    scheduler.shutdown()
+    for task in (daily_task, db_task):
+        task.cancel()
+        try:
+            await task
+        except (asyncio.CancelledError, Exception):
+            pass
+    if "fedex" in modules:
+        await modules["fedex"].aclose()
+    if "whatsapp" in modules:
+        await modules["whatsapp"].close()
     if "db" in modules:
-        modules["db"].close()
+        modules["db"].close_pool()
+    if "io_pool" in modules:
+        modules["io_pool"].shutdown(wait=False)
     logger.info("SonIA Core shut down")
 
 
+class SoniaJSONResponse(ORJSONResponse):
+    """orjson response that falls back to str() for Decimal and other non-native types."""
+
+    def render(self, content: Any) -> bytes:
+        return orjson.dumps(
+            content,
+            default=str,
+            option=orjson.OPT_NON_STR_KEYS | orjson.OPT_SERIALIZE_NUMPY,
+        )
+
+
 app = FastAPI(
     title="SonIA Core",
     description="Daily Tracking Orchestrator - BloomsPal",
     version="1.2.0",
     lifespan=lifespan,
+    default_response_class=SoniaJSONResponse,
 )
 
 
@@ -860,22 +1371,43 @@ async def root():
     }
 
 
+# Last DB probe for /health, reused for _HEALTH_TTL seconds so frequent
+# polling doesn't turn into one round-trip per hit
+_HEALTH_TTL = config.HEALTH_CACHE_SECONDS
+_health_cache = {"ts": float("-inf"), "db_ok": False}
+_health_lock = asyncio.Lock()
+
+
+async def _db_health() -> bool:
+    if time.monotonic() - _health_cache["ts"] < _HEALTH_TTL:
+        return _health_cache["db_ok"]
+    async with _health_lock:
+        # Another request may have refreshed it while we waited
+        if time.monotonic() - _health_cache["ts"] < _HEALTH_TTL:
+            return _health_cache["db_ok"]
+        db = modules.get("db")
+        db_ok = False
+        if db:
+            try:
+                db_ok = await _run_io(db.health_check)
+            except Exception:
+                pass
+        _health_cache.update(ts=time.monotonic(), db_ok=db_ok)
+        return db_ok
+
+
 @app.get("/health")
 async def health():
-    db = modules.get("db")
-    db_ok = False
-    if db:
-        try:
-            db_ok = db.health_check()
-        except Exception:
-            pass
+    db_ok = await _db_health()
 
     return {
         "status": "healthy" if db_ok else "degraded",
         "database": "connected" if db_ok else "disconnected",
-        "modules": list(modules.keys()),
+        # Modules are built lazily, so the list can grow after startup and
+        # isn't precomputed; read the registry directly (one list, no view)
+        "modules": list(_loaded_modules),
         "flow_running": flow_progress["running"],
-        "timestamp": datetime.now(COT).isoformat(),
+        "timestamp": datetime.now(COT).replace(microsecond=0),
     }
 
 
@@ -886,14 +1418,16 @@ async def get_stats():
     if not db:
         raise HTTPException(status_code=503, detail="Database not available")
 
+    def recent_runs():
+        with db.session() as (conn, cur):
+            cur.execute(
+                "SELECT * FROM daily_run_logs ORDER BY created_at DESC LIMIT 5"
+            )
+            return cur.fetchall()
+
     try:
-        db.connect()
-        db.cursor.execute(
-            "SELECT * FROM daily_run_logs ORDER BY created_at DESC LIMIT 5"
-        )
-        runs = db.cursor.fetchall()
-        db.close()
-        return {"recent_runs": [dict(r) for r in runs] if runs else []}
+        runs = await _run_io(recent_runs)
+        return {"recent_runs": runs or []}
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
@@ -916,12 +1450,11 @@ async def admin_run_now():
     if flow_progress["running"]:
         raise HTTPException(status_code=409, detail="Flow is already running")
 
-    if not modules:
-        raise HTTPException(status_code=503, detail="Modules not initialized")
+    if modules.get("db") is None:
+        raise HTTPException(status_code=503, detail="DB module not available")
 
-    import asyncio
     asyncio.create_task(run_daily_flow(modules))
-    return {"status": "started", "timestamp": datetime.now(COT).isoformat()}
+    return {"status": "started", "timestamp": datetime.now(COT)}
 
 
 # ============================================================================
@@ -953,127 +1486,185 @@ async def admin_sync_tenants(data: Dict[str, Any]):
         if not tenant_names:
             raise ValueError("tenant_names is required")
 
-        db.connect()
-
-        synced_count = 0
+        tenants = {}  # tenant_id -> (name, key used in tenant_contacts)
         for tenant_id_str, tenant_name in tenant_names.items():
             try:
-                tenant_id = int(tenant_id_str)
-
-                # Get or create client
-                client_info = db.get_client_by_tenant(tenant_id)
-                client_id = client_info.get("client_id") if client_info else None
+                tenants[int(tenant_id_str)] = (tenant_name, tenant_id_str)
+            except (TypeError, ValueError):
+                logger.error(f"Error syncing tenant {tenant_id_str}: not a tenant number")
+
+        # Collect every row first, then write each table with one
+        # multi-VALUES statement and a single commit
+        def write_tenants():
+            with db.session() as (conn, cur):
+                cur.execute(
+                    "SELECT dynamo_tenant_id, client_id FROM tenant_mapping"
+                    " WHERE dynamo_tenant_id = ANY(%s) AND client_id IS NOT NULL",
+                    (list(tenants),)
+                )
+                client_ids = {row["dynamo_tenant_id"]: row["client_id"] for row in cur.fetchall()}
 
-                if not client_id:
-                    # Create new client
-                    db.cursor.execute("""
+                # Create (or rename) clients for tenants that have none yet
+                new_clients = [(tenants[tid][0], tid) for tid in tenants if tid not in client_ids]
+                if new_clients:
+                    created = execute_values(cur, """
                         INSERT INTO clients (name, dynamo_tenant_id, is_active)
-                        VALUES (%s, %s, TRUE)
+                        VALUES %s
                         ON CONFLICT (dynamo_tenant_id) DO UPDATE
                         SET name = EXCLUDED.name
-                        RETURNING id
-                    """, (tenant_name, tenant_id))
-                    result = db.cursor.fetchone()
-                    client_id = result["id"] if result else None
-
-                if not client_id:
-                    logger.warning(f"Could not create/find client for tenant {tenant_id}")
-                    continue
-
-                # Upsert tenant_mapping
-                db.cursor.execute("""
-                    INSERT INTO tenant_mapping (dynamo_tenant_id, client_name, client_id)
-                    VALUES (%s, %s, %s)
-                    ON CONFLICT (dynamo_tenant_id) DO UPDATE
-                    SET client_name = EXCLUDED.client_name, client_id = EXCLUDED.client_id
-                    RETURNING id
-                """, (tenant_id, tenant_name, client_id))
-                db.conn.commit()
-
-                # Insert contacts if provided
-                contacts = tenant_contacts.get(tenant_id_str, [])
-                for contact in contacts:
-                    name = contact.get("name")
-                    whatsapp = contact.get("whatsapp")
-                    if name and whatsapp:
-                        db.cursor.execute("""
-                            INSERT INTO client_contacts (client_id, name, whatsapp_number, is_active)
-                            VALUES (%s, %s, %s, TRUE)
-                            ON CONFLICT (client_id, name) DO UPDATE
-                            SET whatsapp_number = EXCLUDED.whatsapp_number
-                        """, (client_id, name, whatsapp))
-                        db.conn.commit()
-
-                synced_count += 1
-            except Exception as e:
-                logger.error(f"Error syncing tenant {tenant_id_str}: {e}")
-                try:
-                    db.conn.rollback()
-                except Exception:
-                    pass
-                continue
-
-        db.close()
+                        RETURNING id, dynamo_tenant_id
+                    """, new_clients, template="(%s, %s, TRUE)", page_size=500, fetch=True)
+                    client_ids.update((row["dynamo_tenant_id"], row["id"]) for row in created)
+
+                tenant_rows = []
+                contact_rows = {}  # (client_id, name) -> row; ON CONFLICT can't hit a row twice
+                for tenant_id, (tenant_name, tenant_id_str) in tenants.items():
+                    client_id = client_ids.get(tenant_id)
+                    if not client_id:
+                        logger.warning(f"Could not create/find client for tenant {tenant_id}")
+                        continue
+                    tenant_rows.append((tenant_id, tenant_name, client_id))
+                    for contact in tenant_contacts.get(tenant_id_str, []):
+                        name = contact.get("name")
+                        whatsapp = contact.get("whatsapp")
+                        if name and whatsapp:
+                            contact_rows[(client_id, name)] = (client_id, name, whatsapp)
+
+                if tenant_rows:
+                    execute_values(cur, """
+                        INSERT INTO tenant_mapping (dynamo_tenant_id, client_name, client_id)
+                        VALUES %s
+                        ON CONFLICT (dynamo_tenant_id) DO UPDATE
+                        SET client_name = EXCLUDED.client_name, client_id = EXCLUDED.client_id
+                    """, tenant_rows, page_size=500)
+                if contact_rows:
+                    execute_values(cur, """
+                        INSERT INTO client_contacts (client_id, name, whatsapp_number, is_active)
+                        VALUES %s
+                        ON CONFLICT (client_id, name) DO UPDATE
+                        SET whatsapp_number = EXCLUDED.whatsapp_number
+                    """, list(contact_rows.values()), template="(%s, %s, %s, TRUE)", page_size=500)
+                conn.commit()
+                return len(tenant_rows)
+
+        synced_count = await _run_io(write_tenants)
+
+        DBManager.invalidate_tenant_cache()
         return {
             "status": "success",
             "tenants_synced": synced_count,
             "total_tenants": len(tenant_names),
         }
     except Exception as e:
-        db.close()
         raise HTTPException(status_code=500, detail=str(e))
 
 
+def _dynamo_json_default(value: Any) -> Any:
+    """orjson fallback for raw attribute values: B/BS are bytes, SS/NS/BS are sets."""
+    if isinstance(value, (bytes, bytearray)):
+        return base64.b64encode(value).decode("ascii")
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"Type is not JSON serializable: {type(value).__name__}")
+
+
 @app.get("/admin/dynamo-scan")
-async def admin_dynamo_scan():
-    """Scan DynamoDB to see sample records and identify tenant IDs."""
+async def admin_dynamo_scan(limit: int = 10, full: bool = False):
+    """
+    Scan DynamoDB to see sample records and identify tenant IDs.
+    Items are streamed into the JSON body page by page, so a large `limit`
+    never holds the whole payload in memory. Only the attributes SonIA reads
+    are returned unless full=true.
+    """
     dynamo = modules.get("dynamo")
     if not dynamo:
         raise HTTPException(status_code=503, detail="DynamoDB not available")
 
+    limit = max(1, limit)
+
+    # Pages are fetched on the io pool, so the boto3 call never blocks the loop.
+    # The first one is read up front so table/credential errors still map to a 500
     try:
-        response = dynamo.client.scan(
-            TableName=dynamo.table_name,
-            Limit=10
-        )
-        items = response.get("Items", [])
-        return {
-            "table": dynamo.table_name,
-            "count": response.get("Count", 0),
-            "scanned": response.get("ScannedCount", 0),
-            "items": items
-        }
+        first_page = await _run_io(dynamo.scan_page, limit, full=full)
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
 
+    async def body():
+        page, count, scanned = first_page, 0, 0
+        yield b'{"table":' + orjson.dumps(dynamo.table_name) + b',"items":['
+        while True:
+            for item in page.get("Items", ()):
+                yield (b"," if count else b"") + orjson.dumps(item, default=_dynamo_json_default)
+                count += 1
+            scanned += page.get("ScannedCount", 0)
+            start_key = page.get("LastEvaluatedKey")
+            if not start_key or count >= limit:
+                break
+            try:
+                page = await _run_io(dynamo.scan_page, limit - count, start_key, full=full)
+            except Exception as e:
+                logger.error(f"dynamo-scan stopped after {count} items: {e}")
+                break
+        yield b'],"count":' + orjson.dumps(count) + b',"scanned":' + orjson.dumps(scanned) + b"}"
+
+    return StreamingResponse(body(), media_type="application/json")
+
+
+_DB_STATUS_TABLES = ("clients", "tenant_mapping", "client_contacts",
+                     "shipments", "claims", "daily_run_logs")
+_DB_STATUS_MAPPINGS = "(SELECT COALESCE(json_agg(m), '[]'::json) FROM tenant_mapping m) AS tenant_mappings"
+
+# Exact counts: one scalar COUNT(*) subquery per table. Table names only
+# ever come from the _DB_STATUS_TABLES literal
+_DB_STATUS_EXACT_QUERY = (
+    "SELECT "
+    + ", ".join(f"(SELECT COUNT(*) FROM {table}) AS {table}" for table in _DB_STATUS_TABLES)
+    + ", " + _DB_STATUS_MAPPINGS
+)
+
+# Approximate counts from planner statistics: O(1) per table instead of a
+# full scan. reltuples is -1 until a table has been analyzed, reported as null.
+# Table names are a bound text[] parameter, so the prepared plan is shared by
+# every call; to_regclass skips a table that doesn't exist instead of failing
+_DB_STATUS_APPROX_QUERY = (
+    "SELECT (SELECT json_object_agg(relname, CASE WHEN reltuples < 0 THEN NULL"
+    " ELSE reltuples::bigint END) FROM pg_class"
+    " WHERE oid IN (SELECT to_regclass(t) FROM unnest($1::text[]) AS t)) AS table_counts, "
+    + _DB_STATUS_MAPPINGS
+)
+
 
 @app.get("/admin/db-status")
-async def admin_db_status():
-    """Check database tables and record counts."""
+async def admin_db_status(approximate: bool = False):
+    """
+    Check database tables and record counts.
+    With approximate=true, counts come from pg_class statistics instead of COUNT(*).
+    """
     db = modules.get("db")
     if not db:
         raise HTTPException(status_code=503, detail="Database not available")
 
+    def table_status():
+        # One round-trip for every count plus the mapping rows. Dashboards
+        # poll this, so both queries are prepared once per pooled connection
+        with db.session() as (conn, cur):
+            if approximate:
+                db.execute_prepared(cur, "db_status_approx", _DB_STATUS_APPROX_QUERY,
+                                    (list(_DB_STATUS_TABLES),))
+                row = cur.fetchone()
+                return dict(row["table_counts"] or {}), row["tenant_mappings"]
+            db.execute_prepared(cur, "db_status_exact", _DB_STATUS_EXACT_QUERY)
+            row = dict(cur.fetchone())
+            return row, row.pop("tenant_mappings")
+
     try:
-        db.connect()
-        tables = ['clients', 'tenant_mapping', 'client_contacts',
-                   'shipments', 'claims', 'daily_run_logs']
-        counts = {}
-        for table in tables:
-            db.cursor.execute(f"SELECT COUNT(*) as count FROM {table}")
-            result = db.cursor.fetchone()
-            counts[table] = result["count"] if result else 0
-
-        db.cursor.execute("SELECT * FROM tenant_mapping")
-        mappings = db.cursor.fetchall()
-
-        db.close()
+        counts, mappings = await _run_io(table_status)
+
         return {
             "table_counts": counts,
-            "tenant_mappings": [dict(m) for m in mappings] if mappings else []
+            "tenant_mappings": mappings or []
         }
     except Exception as e:
-        db.close()
         raise HTTPException(status_code=500, detail=str(e))
 
 
@@ -1101,7 +1692,7 @@ async def admin_test_whatsapp(phone: str = None, message: str = None):
     )
 
     try:
-        sent = whatsapp.send_message_sync(target_phone, test_msg)
+        sent = await _run_io(whatsapp.send_message_sync, target_phone, test_msg)
         return {
             "status": "sent" if sent else "failed",
             "phone": target_phone,
@@ -1123,16 +1714,17 @@ async def admin_test_odoo(tenant_number: int = None):
         raise HTTPException(status_code=503, detail="Odoo module not available")
 
     try:
-        auth_ok = odoo.authenticate()
+        auth_ok = await _run_io(odoo.authenticate)
         if not auth_ok:
             return {"status": "error", "detail": "Odoo authentication failed"}
 
         if tenant_number is not None:
-            company = odoo.find_company_by_tenant_number(
+            company = await _run_io(
+                odoo.find_company_by_tenant_number,
                 tenant_number, field_name=config.ODOO_TENANT_FIELD
             )
             if company:
-                contacts = odoo.get_whatsapp_contacts_for_company(company["id"])
+                contacts = await _run_io(odoo.get_whatsapp_contacts_for_company, company["id"])
                 return {
                     "status": "found",
                     "tenant_number": tenant_number,
@@ -1147,7 +1739,7 @@ async def admin_test_odoo(tenant_number: int = None):
                     "hint": "Verify the tenant field exists in Odoo and has the correct value",
                 }
         else:
-            companies = odoo.search_companies()
+            companies = await _run_io(odoo.search_companies)
             return {
                 "status": "ok",
                 "auth": "success",
@@ -1169,19 +1761,19 @@ async def admin_test_spreadsheet():
         raise HTTPException(status_code=503, detail="Odoo module not available")
 
     try:
-        auth_ok = odoo.authenticate()
+        auth_ok = await _run_io(odoo.authenticate)
         if not auth_ok:
             return {"status": "error", "detail": "Odoo authentication failed"}
 
         doc_id = config.ODOO_SPREADSHEET_ID
 
         # Step 1: Diagnostic - test access approaches
-        diagnostic = odoo.test_spreadsheet_access(doc_id)
+        diagnostic = await _run_io(odoo.test_spreadsheet_access, doc_id)
 
         # Step 2: Try to read and parse the spreadsheet
         parsed = None
         try:
-            bbdd = odoo.get_whatsapp_bbdd(doc_id)
+            bbdd = await _run_io(odoo.get_whatsapp_bbdd, doc_id)
             parsed = {
                 "tenant_mapping": {str(k): v for k, v in bbdd.get("tenant_mapping", {}).items()},
                 "contacts_count": len(bbdd.get("contacts", [])),
@@ -1211,8 +1803,8 @@ async def admin_test_flow(tenant_number: int = None):
     if flow_progress["running"]:
         raise HTTPException(status_code=409, detail="Flow is already running")
 
-    if not modules:
-        raise HTTPException(status_code=503, detail="Modules not initialized")
+    if modules.get("db") is None:
+        raise HTTPException(status_code=503, detail="DB module not available")
 
     dynamo = modules.get("dynamo")
     db = modules.get("db")
@@ -1220,18 +1812,20 @@ async def admin_test_flow(tenant_number: int = None):
         raise HTTPException(status_code=503, detail="DynamoDB not available")
 
     try:
-        # Read from DynamoDB
-        raw_shipments = dynamo.scan_all_reserves()
-        if not raw_shipments:
+        # Read from DynamoDB, grouping by tenant as pages stream in, so the
+        # raw scan is never held as one extra list. A known tenant is
+        # filtered server-side, so only its reserves cross the network
+        tenant_groups, reserves_read, _ = await _run_io(
+            _group_reserves, dynamo.iter_reserves(tenant=tenant_number), count_active=False
+        )
+        if tenant_number is not None and not reserves_read:
+            # Nothing for that tenant: a full scan lists the ones that exist
+            tenant_groups, reserves_read, _ = await _run_io(
+                _group_reserves, dynamo.iter_reserves(), count_active=False
+            )
+        if not reserves_read:
             return {"status": "no_data", "detail": "No shipments in DynamoDB"}
 
-        # Group by tenant
-        tenant_groups = defaultdict(list)
-        for reserve in raw_shipments:
-            tid = reserve.get("tenant")
-            if tid is not None:
-                tenant_groups[int(tid)].append(reserve)
-
         # Pick the target tenant
         if tenant_number is not None:
             if tenant_number not in tenant_groups:
@@ -1246,36 +1840,28 @@ async def admin_test_flow(tenant_number: int = None):
 
         reserves = tenant_groups[target_tid]
 
-        # Count packages
-        total_pkgs = sum(len(r.get("packages", [])) for r in reserves)
-        active_pkgs = sum(
-            1 for r in reserves for p in r.get("packages", [])
-            if p.get("status", "").lower() != "delivered"
-        )
+        # Count packages, total and non-delivered, in one pass
+        total_pkgs = 0
+        active_pkgs = 0
+        for r in reserves:
+            pkgs = r.get("packages") or ()
+            total_pkgs += len(pkgs)
+            for p in pkgs:
+                if not p["delivered"]:
+                    active_pkgs += 1
 
         # Load tenant_mapping
-        tenant_mapping = db.get_tenant_mapping() if db else {}
+        tenant_mapping = await _run_io(db.get_tenant_mapping_cached) if db else {}
         tenant_info = tenant_mapping.get(target_tid, {})
         tenant_name = tenant_info.get("tenant_name", f"Tenant #{target_tid}")
         whatsapp_numbers = tenant_info.get("whatsapp_numbers", [])
 
         # Process just this tenant
-        test_stats = {
-            "total_shipments_read": len(raw_shipments),
-            "tenants_found": len(tenant_groups),
-            "tenants_in_mapping": 0,
-            "tenants_missing_mapping": 0,
-            "tenants_no_whatsapp": 0,
-            "new_shipments": 0,
-            "shipments_checked": 0,
-            "shipments_updated": 0,
-            "shipments_delivered": 0,
-            "claims_created": 0,
-            "reports_generated": 0,
-            "reports_sent": 0,
-            "alerts_sent": 0,
-        }
-        test_errors = []
+        test_stats = RunStats(
+            total_shipments_read=reserves_read,
+            tenants_found=len(tenant_groups),
+        )
+        test_errors = RunErrors()
 
         await _process_tenant(
             tenant_id=target_tid,
@@ -1296,8 +1882,8 @@ async def admin_test_flow(tenant_number: int = None):
             "total_packages": total_pkgs,
             "active_packages": active_pkgs,
             "whatsapp_numbers": whatsapp_numbers,
-            "stats": test_stats,
-            "errors": test_errors,
+            "stats": test_stats.as_dict(),
+            "errors": test_errors.as_list(),
         }
     except Exception as e:
         raise HTTPException(status_code=500, detail=str(e))
@@ -1310,58 +1896,75 @@ async def admin_seed_data():
     if not db:
         raise HTTPException(status_code=503, detail="Database not available")
 
-    try:
-        db.connect()
-
-        # 1. Insert BloomsPal client
-        db.cursor.execute("""
-            INSERT INTO clients (name, dynamo_name, dynamo_tenant_id, is_active)
-            VALUES ('BloomsPal', 'BloomsPal', 1, TRUE)
-            ON CONFLICT DO NOTHING
-            RETURNING id
-        """)
-        result = db.cursor.fetchone()
-        client_id = result["id"] if result else None
-
-        if not client_id:
-            db.cursor.execute("SELECT id FROM clients WHERE name = 'BloomsPal'")
-            result = db.cursor.fetchone()
-            client_id = result["id"] if result else None
-
-        # 2. Insert tenant_mapping
-        db.cursor.execute("""
-            INSERT INTO tenant_mapping (dynamo_tenant_id, client_id, tenant_name)
-            VALUES (1, %s, 'BloomsPal')
-            ON CONFLICT (dynamo_tenant_id) DO NOTHING
-            RETURNING *
-        """, (client_id,))
-        mapping = db.cursor.fetchone()
-
-        # 3. Insert contacts
-        contacts = [
-            ("Johan", "573142285386"),
-            ("Danny", "573105870328"),
-            ("Carlos", "573108507879"),
-        ]
-        for name, phone in contacts:
-            db.cursor.execute("""
+    contacts = [
+        ("Johan", "573142285386"),
+        ("Danny", "573105870328"),
+        ("Carlos", "573108507879"),
+    ]
+
+    def seed():
+        with db.session() as (conn, cur):
+            # 1-2. Insert BloomsPal client and its tenant_mapping in a single
+            # statement. The no-op DO UPDATE makes RETURNING yield the
+            # existing tenant-1 client too, so no fallback lookup is needed
+            cur.execute("""
+                WITH client AS (
+                    INSERT INTO clients (name, dynamo_name, dynamo_tenant_id, is_active)
+                    VALUES ('BloomsPal', 'BloomsPal', 1, TRUE)
+                    ON CONFLICT (dynamo_tenant_id) DO UPDATE
+                    SET dynamo_tenant_id = EXCLUDED.dynamo_tenant_id
+                    RETURNING id
+                ), new_mapping AS (
+                    INSERT INTO tenant_mapping (dynamo_tenant_id, client_id, tenant_name)
+                    VALUES (1, (SELECT id FROM client), 'BloomsPal')
+                    ON CONFLICT (dynamo_tenant_id) DO NOTHING
+                    RETURNING id
+                )
+                SELECT (SELECT id FROM client) AS client_id,
+                       (SELECT id FROM new_mapping) AS mapping_id
+            """)
+            result = cur.fetchone()
+            client_id, mapping_id = result["client_id"], result["mapping_id"]
+
+            # 3. Insert contacts
+            execute_values(cur, """
                 INSERT INTO client_contacts (client_id, name, whatsapp_number, is_active)
-                VALUES (%s, %s, %s, TRUE)
+                VALUES %s
                 ON CONFLICT DO NOTHING
-            """, (client_id, name, phone))
+            """, [(client_id, name, phone) for name, phone in contacts],
+                template="(%s, %s, %s, TRUE)")
+
+            conn.commit()
+            return client_id, mapping_id
+
+    try:
+        client_id, mapping_id = await _run_io(seed)
 
-        db.conn.commit()
-        db.close()
+        # Seeded tenants/contacts must not be hidden behind cached lookups
+        DBManager.invalidate_tenant_cache()
+        if "odoo" in modules:
+            modules["odoo"].clear_cache()
 
         return {
             "status": "success",
             "client_id": client_id,
-            "tenant_mapping_id": mapping["id"] if mapping else "already existed",
+            "tenant_mapping_id": mapping_id or "already existed",
             "contacts_added": len(contacts),
             "whatsapp_numbers": ['573142285386', '573105870328', '573108507879']
         }
     except Exception as e:
-        if db.conn:
-            db.conn.rollback()
-        db.close()
         raise HTTPException(status_code=500, detail=str(e))
+
+
+@app.post("/admin/cache-clear")
+async def admin_cache_clear():
+    """Drop cached Odoo lookups, tenant mapping and delivered numbers so the next call refetches."""
+    removed = modules["odoo"].clear_cache() if "odoo" in modules else 0
+    DBManager.invalidate_tenant_cache()
+    delivered_cleared = DBManager.clear_delivered_cache()
+    return {
+        "status": "ok",
+        "odoo_entries_cleared": removed,
+        "delivered_entries_cleared": delivered_cleared,
+        "timestamp": datetime.now(COT),
+    }
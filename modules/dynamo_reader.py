@@ -7,23 +7,42 @@ No writes, modifications, or deletions are allowed.
 """
 
 import logging
+import queue
+import threading
 import boto3
 from botocore.config import Config as BotoConfig
-from typing import List, Dict, Any, Optional
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, List, Dict, Any, Optional
 
 logger = logging.getLogger(__name__)
 
+# Only the attributes _parse_reserve reads are fetched from the table
+RESERVE_ATTRIBUTES = (
+    "id", "tenant", "orderId", "orderNumber", "ecommerceOrderId", "ecommerceId",
+    "shippingAddressPostalCode", "carrierReportId", "createdAt", "updatedAt",
+    "packages",
+)
+# Placeholder -> attribute name, since some attributes are DynamoDB reserved words
+RESERVE_ATTRIBUTE_NAMES = {f"#a{i}": attr for i, attr in enumerate(RESERVE_ATTRIBUTES)}
+RESERVE_PROJECTION = ", ".join(RESERVE_ATTRIBUTE_NAMES)
+
 
 class DynamoReader:
     """Read-only client for DynamoDB reserves table."""
 
     def __init__(self, aws_access_key: str, aws_secret_key: str,
-                 region: str = "us-east-1", table_name: str = "reserves"):
+                 region: str = "us-east-1", table_name: str = "reserves",
+                 scan_segments: int = 8):
         self.table_name = table_name
+        self.scan_segments = max(1, scan_segments)
 
         boto_config = BotoConfig(
             region_name=region,
-            retries={"max_attempts": 3, "mode": "adaptive"}
+            retries={"max_attempts": 3, "mode": "adaptive"},
+            max_pool_connections=max(10, self.scan_segments),
+            # Keep idle pooled HTTPS connections alive between the daily
+            # scan and admin calls, so they are reused instead of re-handshaken
+            tcp_keepalive=True,
         )
 
         self.client = boto3.client(
@@ -34,35 +53,139 @@ class DynamoReader:
         )
         logger.info(f"DynamoDB reader initialized for table '{table_name}' in {region}")
 
-    def scan_all_reserves(self) -> List[Dict[str, Any]]:
+    def scan_all_reserves(self, segments: Optional[int] = None) -> List[Dict[str, Any]]:
         """
         Scan all items from the reserves table.
         Returns a list of parsed reserve objects.
 
+        Convenience wrapper over iter_reserves() for callers that need the
+        whole table at once.
+
         ⚠️ READ ONLY operation (dynamodb:Scan)
         """
-        logger.info(f"Starting full scan of '{self.table_name}'...")
+        items = list(self.iter_reserves(segments))
+        logger.info(f"Scan complete: {len(items)} reserves found")
+        return items
 
-        items = []
-        scan_kwargs = {"TableName": self.table_name}
+    def scan_page(self, limit: int, start_key: Optional[Dict] = None,
+                  full: bool = False) -> Dict[str, Any]:
+        """
+        One raw Scan page of at most `limit` items, for sampling the table.
+        Pass the previous page's LastEvaluatedKey as `start_key` to continue
+        past the 1 MB page boundary. Items are projected to RESERVE_ATTRIBUTES
+        unless `full`.
 
-        while True:
-            response = self.client.scan(**scan_kwargs)
-            raw_items = response.get("Items", [])
+        ⚠️ READ ONLY operation (dynamodb:Scan)
+        """
+        scan_kwargs = {"TableName": self.table_name, "Limit": limit}
+        if not full:
+            scan_kwargs["ProjectionExpression"] = RESERVE_PROJECTION
+            scan_kwargs["ExpressionAttributeNames"] = RESERVE_ATTRIBUTE_NAMES
+        if start_key:
+            scan_kwargs["ExclusiveStartKey"] = start_key
+        return self.client.scan(**scan_kwargs)
 
-            for raw in raw_items:
-                parsed = self._parse_reserve(raw)
-                if parsed:
-                    items.append(parsed)
+    def segments_for_table(self) -> int:
+        """
+        Parallel scan segments matched to the table size: a Scan page holds at
+        most 1 MB, so more segments than MBs only adds idle workers. Capped at
+        self.scan_segments; falls back to it if the size can't be read.
 
-            # Check for pagination
-            last_key = response.get("LastEvaluatedKey")
-            if not last_key:
-                break
-            scan_kwargs["ExclusiveStartKey"] = last_key
+        ⚠️ READ ONLY operation (dynamodb:DescribeTable)
+        """
+        try:
+            table = self.client.describe_table(TableName=self.table_name)["Table"]
+            size_mb = -(-table.get("TableSizeBytes", 0) // (1024 * 1024))  # ceil
+        except Exception as e:
+            logger.warning(f"Could not read size of '{self.table_name}': {e}")
+            return self.scan_segments
+        return max(1, min(self.scan_segments, size_mb))
 
-        logger.info(f"Scan complete: {len(items)} reserves found")
-        return items
+    def iter_reserves(self, segments: Optional[int] = None,
+                      tenant: Optional[int] = None) -> Iterator[Dict[str, Any]]:
+        """
+        Stream parsed reserves from the reserves table as pages arrive.
+
+        With `tenant`, a FilterExpression keeps only that tenant's reserves.
+        DynamoDB still reads the whole table, but only matching items are
+        sent back.
+
+        The table is split into `segments` parallel scan segments (default
+        segments_for_table()), each paged on its own worker thread. boto3
+        clients are thread-safe, so the workers share self.client. Pages are
+        handed over through a bounded queue, so at most a few pages are held
+        in memory ahead of the consumer.
+
+        ⚠️ READ ONLY operation (dynamodb:Scan)
+        """
+        total = max(1, segments or self.segments_for_table())
+        scope = f"tenant {tenant}" if tenant is not None else "full"
+        logger.info(f"Starting {scope} scan of '{self.table_name}' ({total} segments)...")
+
+        if total == 1:
+            for page in self._iter_segment_pages(0, 1, tenant):
+                yield from page
+            return
+
+        pages: queue.Queue = queue.Queue(maxsize=total * 2)
+        done = object()
+        stop = threading.Event()
+
+        def _worker(segment: int):
+            try:
+                for page in self._iter_segment_pages(segment, total, tenant):
+                    if stop.is_set():
+                        return
+                    pages.put(page)
+            except Exception as e:
+                pages.put(e)
+            finally:
+                pages.put(done)
+
+        with ThreadPoolExecutor(max_workers=total) as pool:
+            for seg in range(total):
+                pool.submit(_worker, seg)
+
+            remaining = total
+            try:
+                while remaining:
+                    page = pages.get()
+                    if page is done:
+                        remaining -= 1
+                    elif isinstance(page, Exception):
+                        raise page
+                    else:
+                        yield from page
+            finally:
+                # Consumer stopped early or a segment failed: unblock the
+                # remaining workers so the pool can shut down
+                stop.set()
+                while remaining:
+                    if pages.get() is done:
+                        remaining -= 1
+
+    def _iter_segment_pages(self, segment: int, total_segments: int,
+                            tenant: Optional[int] = None) -> Iterator[List[Dict[str, Any]]]:
+        """Page through one scan segment, projecting only RESERVE_ATTRIBUTES."""
+        scan_kwargs = {
+            "TableName": self.table_name,
+            "ProjectionExpression": RESERVE_PROJECTION,
+            "ExpressionAttributeNames": RESERVE_ATTRIBUTE_NAMES,
+        }
+        if tenant is not None:
+            tenant_name = f"#a{RESERVE_ATTRIBUTES.index('tenant')}"
+            scan_kwargs["FilterExpression"] = f"{tenant_name} = :tenant"
+            scan_kwargs["ExpressionAttributeValues"] = {":tenant": {"N": str(tenant)}}
+        if total_segments > 1:
+            scan_kwargs["Segment"] = segment
+            scan_kwargs["TotalSegments"] = total_segments
+
+        # The paginator follows LastEvaluatedKey and fetches lazily, one page
+        # per iteration
+        paginator = self.client.get_paginator("scan")
+        for response in paginator.paginate(**scan_kwargs):
+            parsed = (self._parse_reserve(raw) for raw in response.get("Items", []))
+            yield [item for item in parsed if item]
 
     def _parse_reserve(self, raw: Dict) -> Optional[Dict[str, Any]]:
         """Parse a raw DynamoDB item into a clean reserve dict."""
@@ -95,12 +218,19 @@ class DynamoReader:
             return None
 
     def _parse_package(self, pkg_map: Dict) -> Optional[Dict[str, Any]]:
-        """Parse a package map from DynamoDB."""
+        """
+        Parse a package map from DynamoDB.
+
+        "delivered" is derived once here so the per-package loops downstream
+        test a bool instead of re-normalizing the status string each pass.
+        """
         try:
+            status = self._get_s(pkg_map, "status")
             return {
                 "id": self._get_s(pkg_map, "id"),
                 "tracking_number": self._get_s(pkg_map, "trackingNumber"),
-                "status": self._get_s(pkg_map, "status"),
+                "status": status,
+                "delivered": status is not None and status.lower() == "delivered",
                 "status_date": self._get_n(pkg_map, "statusDate"),
                 "gross_weight": self._get_n_float(pkg_map, "grossWeight"),
                 "piece_id": self._get_s(pkg_map, "pieceId"),
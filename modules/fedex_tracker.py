@@ -2,8 +2,11 @@
 SonIA Core â FedEx Tracking Module
 Handles OAuth2 authentication, batch tracking, and status normalization.
 Uses connection pooling with httpx and exponential backoff retry logic.
+Batches can also be tracked concurrently through an httpx.AsyncClient,
+bounded by a semaphore instead of serial batches with fixed sleeps.
 """
 
+import asyncio
 import logging
 import httpx
 import json
@@ -126,7 +129,8 @@ def get_sonia_status(status_code: str, description: str = "") -> str:
 
 
 class FedExTracker:
-    def __init__(self, client_id, client_secret, account_number, sandbox=False):
+    def __init__(self, client_id, client_secret, account_number, sandbox=False,
+                 max_concurrency=8):
         self.client_id = client_id
         self.client_secret = client_secret
         self.account_number = account_number
@@ -145,24 +149,49 @@ class FedExTracker:
             timeout=30.0,
             limits=httpx.Limits(max_connections=5, max_keepalive_connections=3)
         )
+        # Sizes both the in-flight semaphore and the async connection pool, so
+        # every concurrent batch gets a kept-alive connection without queueing
+        self.max_concurrency = max(1, max_concurrency)
+        self._async_client = None
+        self._semaphore = None
+        # Serializes async token refreshes, so concurrent batches that find
+        # the token expired trigger one OAuth request between them
+        self._token_lock = None
         logger.info(f"FedExTracker initialized ({'sandbox' if sandbox else 'production'})")
 
+    def _token_request(self):
+        headers = {"Content-Type": "application/x-www-form-urlencoded"}
+        data = {"grant_type": "client_credentials", "client_id": self.client_id, "client_secret": self.client_secret}
+        return headers, data
+
+    def _store_token(self, response):
+        if response.status_code == 200:
+            token_data = response.json()
+            self.access_token = token_data.get("access_token")
+            expires_in = token_data.get("expires_in", 3600)
+            self.token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in - 60)
+            logger.info(f"Authentication successful. Token expires at {self.token_expires_at}")
+            return True
+        logger.error(f"Authentication failed: {response.status_code} - {response.text}")
+        return False
+
     def authenticate(self):
         try:
             logger.info("Authenticating with FedEx OAuth2...")
-            headers = {"Content-Type": "application/x-www-form-urlencoded"}
-            data = {"grant_type": "client_credentials", "client_id": self.client_id, "client_secret": self.client_secret}
+            headers, data = self._token_request()
             response = self._request_with_retry("POST", self.token_url, headers=headers, data=data)
-            if response.status_code == 200:
-                token_data = response.json()
-                self.access_token = token_data.get("access_token")
-                expires_in = token_data.get("expires_in", 3600)
-                self.token_expires_at = datetime.utcnow() + timedelta(seconds=expires_in - 60)
-                logger.info(f"Authentication successful. Token expires at {self.token_expires_at}")
-                return True
-            else:
-                logger.error(f"Authentication failed: {response.status_code} - {response.text}")
-                return False
+            return self._store_token(response)
+        except Exception as e:
+            logger.error(f"Authentication error: {e}")
+            return False
+
+    async def authenticate_async(self):
+        """authenticate() on the shared AsyncClient, with non-blocking retry backoff."""
+        try:
+            logger.info("Authenticating with FedEx OAuth2...")
+            headers, data = self._token_request()
+            response = await self._request_with_retry_async("POST", self.token_url, headers=headers, data=data)
+            return self._store_token(response)
         except Exception as e:
             logger.error(f"Authentication error: {e}")
             return False
@@ -170,10 +199,9 @@ class FedExTracker:
     def track_batch(self, tracking_numbers):
         if not tracking_numbers:
             return {}
-        if not self._is_token_valid():
-            if not self.authenticate():
-                logger.error("Failed to authenticate for tracking")
-                return {tn: {"error": "Authentication failed"} for tn in tracking_numbers}
+        if not self._ensure_token():
+            logger.error("Failed to authenticate for tracking")
+            return {tn: {"error": "Authentication failed"} for tn in tracking_numbers}
         results = {}
         batch_size = 30
         for i in range(0, len(tracking_numbers), batch_size):
@@ -182,33 +210,72 @@ class FedExTracker:
             results.update(batch_results)
         return results
 
+    async def track_batch_async(self, tracking_numbers, concurrency=None):
+        """
+        Track one batch (max 30) under the shared in-flight limit, so callers
+        can act on each batch as soon as it returns. Never raises: failures
+        come back as per-tracking-number {"error": ...} entries.
+        """
+        if not await self._ensure_token_async():
+            logger.error("Failed to authenticate for tracking")
+            return {tn: {"error": "Authentication failed"} for tn in tracking_numbers}
+
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(concurrency or self.max_concurrency)
+
+        async with self._semaphore:
+            return await self._track_batch_request_async(tracking_numbers)
+
+    def _track_headers(self):
+        return {"Authorization": f"Bearer {self.access_token}", "Content-Type": "application/json"}
+
+    @staticmethod
+    def _track_payload(tracking_numbers):
+        return {
+            "trackingInfo": [{"trackingNumberInfo": {"trackingNumber": tn}} for tn in tracking_numbers],
+            "includeDetailedScans": True
+        }
+
+    def _parse_track_response(self, response, tracking_numbers):
+        results = {}
+        if response.status_code == 200:
+            data = response.json()
+            tracking_results = data.get("output", {}).get("completeTrackResults", [])
+            for result in tracking_results:
+                tn = result.get("trackingNumber")
+                if tn:
+                    parsed = self._parse_tracking_result(result)
+                    results[tn] = parsed
+        else:
+            logger.warning(f"Tracking request failed: {response.status_code} - {response.text[:500]}")
+            for tn in tracking_numbers:
+                results[tn] = {"error": f"API returned {response.status_code}", "raw_response": response.text[:1000]}
+        return results
+
     def _track_batch_request(self, tracking_numbers):
         try:
-            headers = {"Authorization": f"Bearer {self.access_token}", "Content-Type": "application/json"}
-            payload = {
-                "trackingInfo": [{"trackingNumberInfo": {"trackingNumber": tn}} for tn in tracking_numbers],
-                "includeDetailedScans": True
-            }
             logger.info(f"Tracking batch of {len(tracking_numbers)} packages via POST")
-            response = self._request_with_retry("POST", self.track_url, headers=headers, json_data=payload)
-            results = {}
-            if response.status_code == 200:
-                data = response.json()
-                tracking_results = data.get("output", {}).get("completeTrackResults", [])
-                for result in tracking_results:
-                    tn = result.get("trackingNumber")
-                    if tn:
-                        parsed = self._parse_tracking_result(result)
-                        results[tn] = parsed
-            else:
-                logger.warning(f"Tracking request failed: {response.status_code} - {response.text[:500]}")
-                for tn in tracking_numbers:
-                    results[tn] = {"error": f"API returned {response.status_code}", "raw_response": response.text[:1000]}
-            return results
+            response = self._request_with_retry(
+                "POST", self.track_url, headers=self._track_headers(),
+                json_data=self._track_payload(tracking_numbers)
+            )
+            return self._parse_track_response(response, tracking_numbers)
         except Exception as e:
             logger.error(f"Error in batch tracking request: {e}")
             return {tn: {"error": str(e)} for tn in tracking_numbers}
 
+    async def _track_batch_request_async(self, tracking_numbers):
+        try:
+            logger.info(f"Tracking batch of {len(tracking_numbers)} packages via async POST")
+            response = await self._request_with_retry_async(
+                "POST", self.track_url, headers=self._track_headers(),
+                json_data=self._track_payload(tracking_numbers)
+            )
+            return self._parse_track_response(response, tracking_numbers)
+        except Exception as e:
+            logger.error(f"Error in async batch tracking request: {e}")
+            return {tn: {"error": str(e)} for tn in tracking_numbers}
+
     def _parse_tracking_result(self, result):
         """
         Parse a FedEx Track API v1 tracking result into normalized format.
@@ -378,6 +445,32 @@ class FedExTracker:
             return False
         return datetime.utcnow() < self.token_expires_at
 
+    def _ensure_token(self):
+        """Reuse the cached OAuth token; only hit the token endpoint once it expires."""
+        return self._is_token_valid() or self.authenticate()
+
+    async def _ensure_token_async(self):
+        """_ensure_token() for the async path: never blocks the event loop."""
+        if self._is_token_valid():
+            return True
+        if self._token_lock is None:
+            self._token_lock = asyncio.Lock()
+        async with self._token_lock:
+            # Another batch may have refreshed it while we waited
+            return self._is_token_valid() or await self.authenticate_async()
+
+    @staticmethod
+    def _retry_wait(response, attempt):
+        """Backoff delay: FedEx's Retry-After on 429 if present, else 2^attempt."""
+        if response is not None and response.status_code == 429:
+            retry_after = response.headers.get("Retry-After")
+            if retry_after:
+                try:
+                    return max(float(retry_after), 0.0)
+                except ValueError:
+                    pass
+        return 2 ** attempt
+
     def _request_with_retry(self, method, url, headers=None, data=None, json_data=None, max_retries=3):
         for attempt in range(max_retries):
             try:
@@ -387,7 +480,7 @@ class FedExTracker:
                     response = self.client.request(method, url, headers=headers, data=data)
                 if response.status_code in [429, 500, 502, 503, 504]:
                     if attempt < max_retries - 1:
-                        wait_time = 2 ** attempt
+                        wait_time = self._retry_wait(response, attempt)
                         logger.warning(f"Request failed with {response.status_code}, retrying in {wait_time}s...")
                         time.sleep(wait_time)
                         continue
@@ -401,6 +494,41 @@ class FedExTracker:
                 raise
         return response
 
+    async def _get_async_client(self) -> httpx.AsyncClient:
+        if self._async_client is None or self._async_client.is_closed:
+            self._async_client = httpx.AsyncClient(
+                timeout=30.0,
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                )
+            )
+        return self._async_client
+
+    async def _request_with_retry_async(self, method, url, headers=None, data=None, json_data=None, max_retries=3):
+        client = await self._get_async_client()
+        for attempt in range(max_retries):
+            try:
+                if json_data:
+                    response = await client.request(method, url, headers=headers, json=json_data)
+                else:
+                    response = await client.request(method, url, headers=headers, data=data)
+                if response.status_code in [429, 500, 502, 503, 504]:
+                    if attempt < max_retries - 1:
+                        wait_time = self._retry_wait(response, attempt)
+                        logger.warning(f"Request failed with {response.status_code}, retrying in {wait_time}s...")
+                        await asyncio.sleep(wait_time)
+                        continue
+                return response
+            except httpx.RequestError as e:
+                if attempt < max_retries - 1:
+                    wait_time = 2 ** attempt
+                    logger.warning(f"Request error: {e}, retrying in {wait_time}s...")
+                    await asyncio.sleep(wait_time)
+                    continue
+                raise
+        return response
+
     def track_multiple(self, tracking_numbers):
         return self.track_batch(tracking_numbers)
 
@@ -408,3 +536,8 @@ class FedExTracker:
         if self.client:
             self.client.close()
             logger.info("FedExTracker client closed")
+
+    async def aclose(self):
+        if self._async_client and not self._async_client.is_closed:
+            await self._async_client.aclose()
+        self.close()
@@ -4,17 +4,23 @@ Connects to Odoo via XML-RPC to read WhatsApp BBDD spreadsheet.
 """
 
 import json
+import time
 import base64
 import logging
+import threading
 import zlib
-from typing import Dict, List, Optional, Any
+from collections import OrderedDict
+from typing import Callable, Dict, List, Optional, Any, Tuple
 from xmlrpc import client as xmlrpc_client
 
 logger = logging.getLogger(__name__)
 
 
 class OdooClient:
-    def __init__(self, url: str, db: str, username: str, password: str):
+    CACHE_MAX_ENTRIES = 500
+
+    def __init__(self, url: str, db: str, username: str, password: str,
+                 cache_ttl: float = 3600.0):
         self.url = url
         self.db = db
         self.username = username
@@ -22,25 +28,69 @@ class OdooClient:
         self.uid = None
         self.common = None
         self.models = None
-
-    def authenticate(self) -> bool:
-        try:
-            self.common = xmlrpc_client.ServerProxy(f"{self.url}/xmlrpc/2/common")
-            self.uid = self.common.authenticate(self.db, self.username, self.password, {})
-            if self.uid:
-                self.models = xmlrpc_client.ServerProxy(f"{self.url}/xmlrpc/2/object")
-                logger.info(f"Odoo auth OK - uid={self.uid}")
+        # ServerProxy shares one HTTP connection and is not thread-safe;
+        # calls arrive from the io_pool workers concurrently
+        self._rpc_lock = threading.Lock()
+        # Tenant->company and company->contacts barely change day to day
+        self.cache_ttl = cache_ttl
+        self._cache: "OrderedDict[Tuple, Tuple[float, Any]]" = OrderedDict()
+
+    def authenticate(self, force: bool = False) -> bool:
+        """
+        Log in once and keep the uid for the process lifetime. The ServerProxy
+        objects are kept too, so their transport reuses the keep-alive
+        connection instead of a fresh TLS handshake per call.
+        """
+        with self._rpc_lock:
+            if self.uid and self.models and not force:
                 return True
-            logger.error("Odoo auth failed - no uid")
-            return False
-        except Exception as e:
-            logger.error(f"Odoo auth error: {e}")
-            return False
+            try:
+                if self.common is None:
+                    self.common = xmlrpc_client.ServerProxy(f"{self.url}/xmlrpc/2/common")
+                self.uid = self.common.authenticate(self.db, self.username, self.password, {})
+                if self.uid:
+                    if self.models is None:
+                        self.models = xmlrpc_client.ServerProxy(f"{self.url}/xmlrpc/2/object")
+                    logger.info(f"Odoo auth OK - uid={self.uid}")
+                    return True
+                logger.error("Odoo auth failed - no uid")
+                return False
+            except Exception as e:
+                logger.error(f"Odoo auth error: {e}")
+                self.uid = None
+                self.common = None
+                self.models = None
+                return False
 
     def _execute(self, model: str, method: str, *args, **kwargs):
-        return self.models.execute_kw(
-            self.db, self.uid, self.password, model, method, *args, **kwargs
-        )
+        with self._rpc_lock:
+            return self.models.execute_kw(
+                self.db, self.uid, self.password, model, method, *args, **kwargs
+            )
+
+    # ==================================================================
+    # LOOKUP CACHE - TTL + LRU bound, empty results are not cached
+    # ==================================================================
+
+    def _cached(self, key: Tuple, loader: Callable[[], Any]) -> Any:
+        now = time.monotonic()
+        hit = self._cache.get(key)
+        if hit and hit[0] > now:
+            self._cache.move_to_end(key)
+            return hit[1]
+        value = loader()
+        if value:
+            self._cache[key] = (now + self.cache_ttl, value)
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.CACHE_MAX_ENTRIES:
+                self._cache.popitem(last=False)
+        return value
+
+    def clear_cache(self) -> int:
+        """Drop all cached lookups. Returns how many entries were removed."""
+        removed = len(self._cache)
+        self._cache.clear()
+        return removed
 
     # ==================================================================
     # SPREADSHEET ACCESS - Multiple approaches for Odoo Documents
@@ -339,17 +389,42 @@ class OdooClient:
         )
 
     def find_company_by_tenant_number(self, tenant_number: int, field_name: str = "x_studio_tenant") -> Optional[Dict]:
-        try:
+        def _load():
             results = self._execute(
                 "res.partner", "search_read",
                 [[[field_name, "=", tenant_number], ["is_company", "=", True]]],
                 {"fields": ["id", "name", "email", "phone", field_name], "limit": 1}
             )
             return results[0] if results else None
+
+        try:
+            return self._cached(("company", field_name, tenant_number), _load)
         except Exception as e:
             logger.error(f"Tenant lookup error: {e}")
             return None
 
+    def get_whatsapp_contacts_for_company(self, company_id: int) -> List[Dict]:
+        """Child contacts of a company that have a phone usable for WhatsApp."""
+        def _load():
+            contacts = self._execute(
+                "res.partner", "search_read",
+                [[["parent_id", "=", company_id]]],
+                {"fields": ["id", "name", "mobile", "phone"]}
+            )
+            return [wc for wc in map(self._whatsapp_contact, contacts) if wc]
+
+        try:
+            return self._cached(("contacts", company_id), _load)
+        except Exception as e:
+            logger.error(f"Company contacts lookup error: {e}")
+            return []
+
+    def _whatsapp_contact(self, contact: Dict) -> Optional[Dict]:
+        whatsapp = self._clean_phone(contact.get("mobile") or contact.get("phone") or "")
+        if not whatsapp:
+            return None
+        return {"id": contact.get("id"), "name": contact.get("name"), "whatsapp": whatsapp}
+
     def find_company_by_name(self, name: str) -> Optional[Dict]:
         try:
             results = self._execute(
@@ -3,7 +3,10 @@ SonIA Core — WhatsApp Sender Module
 Sends reports and alerts through SonIA Agent's API.
 """
 
+import asyncio
 import logging
+import os
+import threading
 import httpx
 from typing import Optional
 
@@ -13,36 +16,64 @@ logger = logging.getLogger(__name__)
 class WhatsAppSender:
     """Sends WhatsApp messages via SonIA Agent API."""
 
-    def __init__(self, agent_url: str, api_key: str):
+    def __init__(self, agent_url: str, api_key: str, max_concurrency: int = 4):
         self.agent_url = agent_url.rstrip("/")
         self.api_key = api_key
         self._client = None
+        self._sync_client = None
+        # The *_sync senders run on several io_pool threads at once
+        self._sync_client_lock = threading.Lock()
+        # Caps async sends in flight across all tenants (SonIA Agent rate limit)
+        self.max_concurrency = max(1, max_concurrency)
+        self._semaphore = None
 
     async def _get_client(self) -> httpx.AsyncClient:
         if self._client is None or self._client.is_closed:
+            # Pool sized to the send semaphore: every in-flight send reuses a
+            # kept-alive connection instead of paying a fresh TLS handshake
             self._client = httpx.AsyncClient(
                 timeout=httpx.Timeout(30.0),
-                headers={"X-API-Key": self.api_key}
+                headers={"X-API-Key": self.api_key},
+                limits=httpx.Limits(
+                    max_connections=self.max_concurrency,
+                    max_keepalive_connections=self.max_concurrency,
+                    keepalive_expiry=60.0,
+                ),
             )
         return self._client
 
+    def _get_sync_client(self) -> httpx.Client:
+        """Shared keep-alive client for the *_sync senders."""
+        client = self._sync_client
+        if client is None or client.is_closed:
+            with self._sync_client_lock:
+                # Another thread may have built it while we waited
+                client = self._sync_client
+                if client is None or client.is_closed:
+                    client = self._sync_client = httpx.Client(
+                        timeout=httpx.Timeout(30.0),
+                        headers={"X-API-Key": self.api_key},
+                        limits=httpx.Limits(keepalive_expiry=60.0),
+                    )
+        return client
+
     def send_message_sync(self, phone_number: str, message: str) -> bool:
         """Send a text message via WhatsApp (synchronous)."""
         try:
-            with httpx.Client(timeout=30.0, headers={"X-API-Key": self.api_key}) as client:
-                response = client.post(
-                    f"{self.agent_url}/api/send-message",
-                    json={
-                        "phone_number": phone_number,
-                        "message": message,
-                    }
-                )
-                if response.status_code == 200:
-                    logger.info(f"Message sent to {phone_number}")
-                    return True
-                else:
-                    logger.error(f"Failed to send message to {phone_number}: {response.status_code} {response.text}")
-                    return False
+            client = self._get_sync_client()
+            response = client.post(
+                f"{self.agent_url}/api/send-message",
+                json={
+                    "phone_number": phone_number,
+                    "message": message,
+                }
+            )
+            if response.status_code == 200:
+                logger.info(f"Message sent to {phone_number}")
+                return True
+            else:
+                logger.error(f"Failed to send message to {phone_number}: {response.status_code} {response.text}")
+                return False
         except Exception as e:
             logger.error(f"Error sending message to {phone_number}: {e}")
             return False
@@ -51,8 +82,34 @@ class WhatsAppSender:
                          client_name: str = "") -> bool:
         """Send a tracking report via WhatsApp (synchronous)."""
         try:
-            with httpx.Client(timeout=30.0, headers={"X-API-Key": self.api_key}) as client:
-                response = client.post(
+            client = self._get_sync_client()
+            response = client.post(
+                f"{self.agent_url}/api/send-report",
+                json={
+                    "phone_number": phone_number,
+                    "report": report_text,
+                    "client_name": client_name,
+                }
+            )
+            if response.status_code == 200:
+                logger.info(f"Report sent to {phone_number} for {client_name}")
+                return True
+            else:
+                logger.error(f"Failed to send report to {phone_number}: {response.status_code}")
+                return False
+        except Exception as e:
+            logger.error(f"Error sending report to {phone_number}: {e}")
+            return False
+
+    async def send_report_async(self, phone_number: str, report_text: str,
+                                client_name: str = "") -> bool:
+        """Send a tracking report via WhatsApp on the shared async client."""
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+        try:
+            client = await self._get_client()
+            async with self._semaphore:
+                response = await client.post(
                     f"{self.agent_url}/api/send-report",
                     json={
                         "phone_number": phone_number,
@@ -60,12 +117,12 @@ class WhatsAppSender:
                         "client_name": client_name,
                     }
                 )
-                if response.status_code == 200:
-                    logger.info(f"Report sent to {phone_number} for {client_name}")
-                    return True
-                else:
-                    logger.error(f"Failed to send report to {phone_number}: {response.status_code}")
-                    return False
+            if response.status_code == 200:
+                logger.info(f"Report sent to {phone_number} for {client_name}")
+                return True
+            else:
+                logger.error(f"Failed to send report to {phone_number}: {response.status_code}")
+                return False
         except Exception as e:
             logger.error(f"Error sending report to {phone_number}: {e}")
             return False
@@ -76,28 +133,28 @@ class WhatsAppSender:
 
     def send_file_sync(self, phone_number: str, file_path: str, caption: str = "") -> bool:
         """Send a file (e.g. Excel report) via WhatsApp (synchronous)."""
-        import os
         if not os.path.exists(file_path):
             logger.error(f"File not found: {file_path}")
             return False
         try:
             filename = os.path.basename(file_path)
-            with httpx.Client(timeout=60.0, headers={"X-API-Key": self.api_key}) as client:
-                with open(file_path, "rb") as f:
-                    response = client.post(
-                        f"{self.agent_url}/api/send-file",
-                        data={
-                            "phone_number": phone_number,
-                            "caption": caption or filename,
-                        },
-                        files={"file": (filename, f, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
-                    )
-                if response.status_code == 200:
-                    logger.info(f"File {filename} sent to {phone_number}")
-                    return True
-                else:
-                    logger.error(f"Failed to send file to {phone_number}: {response.status_code} {response.text}")
-                    return False
+            client = self._get_sync_client()
+            with open(file_path, "rb") as f:
+                response = client.post(
+                    f"{self.agent_url}/api/send-file",
+                    data={
+                        "phone_number": phone_number,
+                        "caption": caption or filename,
+                    },
+                    files={"file": (filename, f, "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet")},
+                    timeout=60.0,
+                )
+            if response.status_code == 200:
+                logger.info(f"File {filename} sent to {phone_number}")
+                return True
+            else:
+                logger.error(f"Failed to send file to {phone_number}: {response.status_code} {response.text}")
+                return False
         except Exception as e:
             logger.error(f"Error sending file to {phone_number}: {e}")
             return False
@@ -105,3 +162,5 @@ class WhatsAppSender:
     async def close(self):
         if self._client and not self._client.is_closed:
             await self._client.aclose()
+        if self._sync_client and not self._sync_client.is_closed:
+            self._sync_client.close()
@@ -0,0 +1,91 @@
+"""
+run_migration() against a real PostgreSQL.
+
+Set SONIA_TEST_DATABASE_URL to a throwaway database: every test drops and
+recreates its public schema.
+"""
+
+import dataclasses
+import logging
+import os
+
+import pytest
+
+psycopg2 = pytest.importorskip("psycopg2")
+main = pytest.importorskip("main")
+
+TEST_DATABASE_URL = os.getenv("SONIA_TEST_DATABASE_URL")
+MIGRATIONS_DIR = os.path.join(os.path.dirname(main.__file__), "migrations")
+
+pytestmark = pytest.mark.skipif(
+    not TEST_DATABASE_URL, reason="SONIA_TEST_DATABASE_URL not set"
+)
+
+
+def _execute(sql):
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    try:
+        conn.autocommit = True
+        with conn.cursor() as cur:
+            cur.execute(sql)
+    finally:
+        conn.close()
+
+
+def _applied():
+    conn = psycopg2.connect(TEST_DATABASE_URL)
+    try:
+        with conn.cursor() as cur:
+            cur.execute("SELECT version, checksum FROM schema_migrations")
+            return dict(cur.fetchall())
+    finally:
+        conn.close()
+
+
+def _expected():
+    return {fname: checksum for fname, _, checksum in main._read_migrations(MIGRATIONS_DIR)}
+
+
+@pytest.fixture
+def empty_db(monkeypatch):
+    _execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public")
+    monkeypatch.setattr(
+        main, "config", dataclasses.replace(main.config, DATABASE_URL=TEST_DATABASE_URL)
+    )
+    yield
+    main.DBManager(TEST_DATABASE_URL).close_pool()
+    _execute("DROP SCHEMA public CASCADE; CREATE SCHEMA public")
+
+
+def _warnings(caplog):
+    return [r for r in caplog.records if r.levelno >= logging.WARNING]
+
+
+def test_fresh_database_applies_every_migration(empty_db, caplog):
+    with caplog.at_level(logging.INFO, logger="sonia-core"):
+        main.run_migration()
+    assert _applied() == _expected()
+    assert not _warnings(caplog)
+
+
+def test_existing_schema_records_baseline_instead_of_rerunning(empty_db, caplog):
+    # A database migrated before schema_migrations existed
+    with open(os.path.join(MIGRATIONS_DIR, main._BASELINE_MIGRATION)) as f:
+        _execute(f.read())
+
+    with caplog.at_level(logging.INFO, logger="sonia-core"):
+        main.run_migration()
+
+    assert _applied() == _expected()
+    assert not _warnings(caplog)
+
+
+def test_second_boot_applies_nothing(empty_db, caplog):
+    main.run_migration()
+    first = _applied()
+
+    with caplog.at_level(logging.INFO, logger="sonia-core"):
+        main.run_migration()
+
+    assert _applied() == first
+    assert not _warnings(caplog)